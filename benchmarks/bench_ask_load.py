@@ -0,0 +1,163 @@
+"""
+GreenBharat AI — /api/ask Load Benchmark
+Measures /api/aqi latency (p50/p99) while /api/ask is hammered against a
+slow or dead RAG server.
+
+The API server, the fake RAG server and the /api/ask load generator each run
+in their own process, and /api/aqi is probed from this one, so client-side
+work never competes with the server for the same GIL.
+
+Usage:
+    python -m benchmarks.bench_ask_load --rag slow --ask-workers 16 --duration 10
+    python -m benchmarks.bench_ask_load --rag down --data-dir benchmarks/data/10k-seed42
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from benchmarks.common import percentile
+
+QUERIES = ["what is pm2.5", "how to reduce air pollution", "india climate targets"]
+
+
+def serve_slow_rag(delay, ready):
+    """Process target: fake RAG server that answers every POST after `delay` seconds."""
+    class SlowHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(delay)
+            body = json.dumps({"answer": "slow answer", "sources": []}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    ready.put(f"http://127.0.0.1:{server.server_address[1]}")
+    server.serve_forever()
+
+
+def serve_api(rag_url, data_dir, ready):
+    """Process target: the API server, pointed at rag_url and data_dir."""
+    if data_dir:
+        os.environ["GREENBHARAT_DATA_DIR"] = data_dir
+    os.environ["GREENBHARAT_OUTPUT_DIR"] = tempfile.mkdtemp()
+    from werkzeug.serving import make_server
+
+    from src.backend import api_server
+    from src.backend.rag_client import RagClient
+
+    api_server.rag_client = RagClient(rag_url)
+    api_server.read_csv_data()
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    api = make_server("127.0.0.1", 0, api_server.app, threaded=True)
+    ready.put(f"http://127.0.0.1:{api.server_address[1]}")
+    api.serve_forever()
+
+
+def generate_ask_load(base, workers, duration, results):
+    """Process target: `workers` threads posting /api/ask for `duration` seconds."""
+    latencies = []
+    deadline = time.monotonic() + duration
+
+    def ask_worker(worker_id):
+        session = requests.Session()
+        i = worker_id
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                session.post(f"{base}/api/ask", json={"query": QUERIES[i % len(QUERIES)]}, timeout=30)
+            except requests.RequestException:
+                pass
+            latencies.append(time.perf_counter() - start)
+            i += 1
+
+    threads = [threading.Thread(target=ask_worker, args=(n,)) for n in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    results.put(latencies)
+
+
+def run(args):
+    ctx = multiprocessing.get_context("spawn")
+    ready = ctx.Queue()
+    processes = []
+
+    if args.rag == "slow":
+        processes.append(ctx.Process(target=serve_slow_rag, args=(args.rag_delay, ready), daemon=True))
+        processes[-1].start()
+        rag_url = ready.get(timeout=30)
+    else:
+        rag_url = "http://127.0.0.1:9"  # nothing listens on discard
+
+    processes.append(ctx.Process(target=serve_api, args=(rag_url, args.data_dir, ready), daemon=True))
+    processes[-1].start()
+    base = ready.get(timeout=300)
+
+    session = requests.Session()
+    session.get(f"{base}/api/aqi", timeout=30)  # warm up
+
+    ask_results = ctx.Queue()
+    load = ctx.Process(target=generate_ask_load,
+                       args=(base, args.ask_workers, args.duration, ask_results), daemon=True)
+    load.start()
+
+    aqi_latencies = []
+    deadline = time.monotonic() + args.duration
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        session.get(f"{base}/api/aqi", timeout=30)
+        aqi_latencies.append(time.perf_counter() - start)
+        time.sleep(args.aqi_interval)
+
+    ask_latencies = ask_results.get(timeout=120)
+    load.join(timeout=30)
+    metrics = session.get(f"{base}/metrics", timeout=30).text.splitlines()
+    breaker_open = "api_rag_breaker_open 1" in metrics
+    for process in processes:
+        process.terminate()
+
+    return {
+        "rag": args.rag,
+        "ask_workers": args.ask_workers,
+        "aqi_requests": len(aqi_latencies),
+        "aqi_p50_ms": round(percentile(aqi_latencies, 50) * 1000, 2),
+        "aqi_p99_ms": round(percentile(aqi_latencies, 99) * 1000, 2),
+        "ask_requests": len(ask_latencies),
+        "ask_p50_ms": round(percentile(ask_latencies, 50) * 1000, 2) if ask_latencies else None,
+        "ask_p99_ms": round(percentile(ask_latencies, 99) * 1000, 2) if ask_latencies else None,
+        "breaker_open": breaker_open,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rag", choices=["slow", "down"], default="slow")
+    parser.add_argument("--rag-delay", type=float, default=3.0, help="fake RAG response delay (s)")
+    parser.add_argument("--ask-workers", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--aqi-interval", type=float, default=0.02)
+    parser.add_argument("--data-dir", default=None, help="directory holding sensor_data.csv for the API")
+    args = parser.parse_args()
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+GreenBharat AI — Spatial Index Benchmark
+Checks StationIndex radius, nearest-N and bounding-box queries against a
+brute-force haversine scan over random stations spread over the whole globe,
+with extra queries at the antimeridian and near the poles, and times both.
+Exits non-zero if any query result differs from brute force.
+
+Usage:
+    python -m benchmarks.bench_geo --stations 5000 --queries 500
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+
+from src.backend.geo_index import StationIndex, haversine_km
+
+RADII_KM = (10, 50, 300, 1500, 8000)
+NEAREST_N = (1, 4, 10)
+
+
+def random_point(rng):
+    """Uniformly distributed point on the sphere."""
+    return math.degrees(math.asin(rng.uniform(-1, 1))), rng.uniform(-180, 180)
+
+
+def make_queries(rng, count):
+    """Random queries plus antimeridian and polar cases (a fifth each)."""
+    queries = [random_point(rng) for _ in range(count - 2 * (count // 5))]
+    for _ in range(count // 5):
+        lon = rng.choice((-180, 180)) + rng.uniform(-1, 1)
+        queries.append((rng.uniform(-89, 89), ((lon + 180) % 360) - 180))
+    for _ in range(count // 5):
+        queries.append((rng.choice((-1, 1)) * rng.uniform(80, 90), rng.uniform(-180, 180)))
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    index = StationIndex()
+    stations = {}
+    for station_id in range(args.stations):
+        lat, lon = random_point(rng)
+        stations[station_id] = (lat, lon)
+        index.update(station_id, lat, lon, {"id": station_id})
+
+    def brute_distances(lat, lon):
+        return sorted((haversine_km(lat, lon, s_lat, s_lon), sid) for sid, (s_lat, s_lon) in stations.items())
+
+    mismatches = {"within_radius": 0, "nearest": 0, "in_bbox": 0}
+    index_s = brute_s = 0.0
+    queries = make_queries(rng, args.queries)
+    for lat, lon in queries:
+        radius = rng.choice(RADII_KM)
+        n = rng.choice(NEAREST_N)
+
+        start = time.perf_counter()
+        in_radius = sorted(reading["id"] for _, reading in index.within_radius(lat, lon, radius))
+        nearest = [distance for distance, _ in index.nearest(lat, lon, n)]
+        index_s += time.perf_counter() - start
+
+        start = time.perf_counter()
+        distances = brute_distances(lat, lon)
+        brute_s += time.perf_counter() - start
+
+        if in_radius != sorted(sid for d, sid in distances if d <= radius):
+            mismatches["within_radius"] += 1
+        if len(nearest) != n or any(abs(a - b) > 1e-9 for a, (b, _) in zip(nearest, distances)):
+            mismatches["nearest"] += 1
+
+        # Boxes around the query point, half of them crossing the antimeridian
+        half_lat, half_lon = rng.uniform(0.5, 20), rng.uniform(0.5, 40)
+        min_lat, max_lat = max(-90.0, lat - half_lat), min(90.0, lat + half_lat)
+        min_lon = ((lon - half_lon + 180) % 360) - 180
+        max_lon = ((lon + half_lon + 180) % 360) - 180
+        crosses = min_lon > max_lon
+        in_box = sorted(reading["id"] for reading in index.in_bbox(min_lat, min_lon, max_lat, max_lon))
+        expected = sorted(
+            sid for sid, (s_lat, s_lon) in stations.items()
+            if min_lat <= s_lat <= max_lat
+            and ((s_lon >= min_lon or s_lon <= max_lon) if crosses else min_lon <= s_lon <= max_lon)
+        )
+        if in_box != expected:
+            mismatches["in_bbox"] += 1
+
+    print(json.dumps({
+        "stations": args.stations,
+        "queries": len(queries),
+        "mismatches": mismatches,
+        "index_ms_per_query": round(index_s / len(queries) * 1000, 3),
+        "brute_force_ms_per_query": round(brute_s / len(queries) * 1000, 3),
+    }, indent=2))
+    if any(mismatches.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+GreenBharat AI — Knowledge Base Retrieval Benchmark
+Compares the legacy "split on ## and truncate per request" retriever with the
+chunked knowledge base on the knowledge/ corpus: retrieval hit rate on a small
+labelled query set, and per-query CPU time for search + answer.
+
+Usage:
+    python -m benchmarks.bench_knowledge --repeat 200
+"""
+
+import argparse
+import json
+import os
+import time
+
+from src.backend.knowledge_base import load_knowledge_base, search_knowledge, generate_answer
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KNOWLEDGE_DIR = os.path.join(ROOT_DIR, "knowledge")
+
+# (query, text the relevant chunk must contain)
+LABELLED_QUERIES = [
+    ("what is the who guideline for pm2.5", "WHO Guideline (2021)**: Annual mean ≤5"),
+    ("health effects of nitrogen dioxide", "Inflames airways"),
+    ("how is aqi calculated", "sub-index"),
+    ("delhi winter aqi stubble burning", "Odd-even vehicle scheme"),
+    ("net zero target year for india", "2070"),
+    ("what is safar forecasting", "SAFAR"),
+    ("how can i reduce pollution from transportation", "public transport"),
+    ("rooftop solar subsidy scheme", "PM Surya Ghar"),
+    ("national clean air programme target", "NCAP"),
+    ("carbon footprint of a car", "Carbon Footprint"),
+    ("air quality in bangalore", "Bangalore"),
+    ("electric vehicle incentives fame", "FAME"),
+]
+
+
+def load_legacy(knowledge_dir):
+    """The original loader: split each file on level-2 headings only."""
+    knowledge_base = []
+    for filename in sorted(os.listdir(knowledge_dir)):
+        if filename.endswith(".md"):
+            with open(os.path.join(knowledge_dir, filename), "r", encoding="utf-8") as f:
+                for section in f.read().split("\n## "):
+                    knowledge_base.append({"source": filename, "content": section.strip()})
+    return knowledge_base
+
+
+def search_legacy(knowledge_base, query):
+    query_words = set(query.lower().split())
+    scored = []
+    for entry in knowledge_base:
+        content_lower = entry["content"].lower()
+        score = sum(1 for w in query_words if w in content_lower)
+        if query.lower() in content_lower:
+            score += 5
+        if score > 0:
+            scored.append((score, entry))
+    scored.sort(key=lambda x: -x[0])
+    return scored[:3]
+
+
+def answer_legacy(query, context_entries):
+    answer_lines = ["Based on the GreenBharat knowledge base:\n"]
+    for score, entry in context_entries[:2]:
+        relevant_lines = []
+        for line in entry["content"][:500].split("\n"):
+            line = line.strip()
+            if line and not line.startswith("#") and len(line) > 20:
+                relevant_lines.append(line)
+            if len(relevant_lines) >= 4:
+                break
+        answer_lines.extend(relevant_lines)
+    return "\n".join(answer_lines)
+
+
+def evaluate(name, knowledge_base, search, answer, repeat):
+    hits_at_1 = hits_at_3 = answered = 0
+    for query, expected in LABELLED_QUERIES:
+        results = search(knowledge_base, query)
+        contents = [entry["content"] for score, entry in results]
+        hits_at_1 += bool(contents) and expected in contents[0]
+        hits_at_3 += any(expected in c for c in contents)
+        text = answer(query, results)
+        text = text["answer"] if isinstance(text, dict) else text
+        answered += expected in text
+
+    start = time.process_time()
+    for _ in range(repeat):
+        for query, _expected in LABELLED_QUERIES:
+            answer(query, search(knowledge_base, query))
+    cpu = time.process_time() - start
+
+    tokens = [len(entry["content"].split()) for entry in knowledge_base]
+    n = len(LABELLED_QUERIES)
+    return {
+        "retriever": name,
+        "chunks": len(knowledge_base),
+        "chunk_tokens_max": max(tokens),
+        "chunk_tokens_mean": round(sum(tokens) / len(tokens), 1),
+        "hit_at_1": round(hits_at_1 / n, 3),
+        "hit_at_3": round(hits_at_3 / n, 3),
+        "answer_contains_expected": round(answered / n, 3),
+        "cpu_us_per_query": round(cpu / (repeat * n) * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--knowledge-dir", default=KNOWLEDGE_DIR)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    results = [
+        evaluate("legacy_sections", load_legacy(args.knowledge_dir), search_legacy, answer_legacy, args.repeat),
+        evaluate("chunked", load_knowledge_base(args.knowledge_dir), search_knowledge, generate_answer, args.repeat),
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
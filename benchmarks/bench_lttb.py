@@ -0,0 +1,106 @@
+"""
+GreenBharat AI — LTTB Decimation Benchmark
+Times the numpy LTTB used by /api/trends?points=N on a 1M-point series,
+reports how many of its points match a straightforward pure-Python LTTB, and
+compares the JSON payload of raw vs decimated series.
+
+Usage:
+    python -m benchmarks.bench_lttb --size 1000000 --points 500,1000,5000
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from src.backend.trend_series import lttb
+
+
+def lttb_reference(x, y, n_out):
+    """Textbook pure-Python LTTB, used as the correctness and speed baseline."""
+    n = len(x)
+    if n_out >= n:
+        return list(range(n))
+    x = [v - x[0] for v in x]
+    every = (n - 2) / (n_out - 2)
+    selected = [0]
+    a = 0
+    for i in range(n_out - 2):
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1 if i < n_out - 3 else n - 1
+        next_lo, next_hi = hi, (int((i + 2) * every) + 1 if i + 1 < n_out - 3 else n - 1)
+        if i + 1 < n_out - 2:
+            cx = sum(x[next_lo:next_hi]) / (next_hi - next_lo)
+            cy = sum(y[next_lo:next_hi]) / (next_hi - next_lo)
+        else:
+            cx, cy = x[n - 1], y[n - 1]
+        ax, ay = x[a], y[a]
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((ax - cx) * (y[j] - ay) - (ax - x[j]) * (cy - ay))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+
+def make_series(size, seed):
+    """AQI-like random walk with spikes, sampled every 4 seconds."""
+    rng = np.random.default_rng(seed)
+    x = 1_767_225_600 + np.arange(size, dtype=np.float64) * 4
+    walk = np.cumsum(rng.normal(0, 1.5, size))
+    spikes = (rng.random(size) < 0.05) * rng.uniform(50, 150, size)
+    y = np.clip(120 + walk - walk.mean() + spikes, 0, 500)
+    return x, y
+
+
+def time_call(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--points", default="500,1000,5000")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-reference", action="store_true", help="skip the slow pure-Python baseline")
+    args = parser.parse_args()
+
+    x, y = make_series(args.size, args.seed)
+    x_list, y_list = x.tolist(), y.tolist()
+    raw_bytes = len(json.dumps({"t": x_list, "v": y_list}))
+
+    results = []
+    for n_out in [int(p) for p in args.points.split(",")]:
+        seconds, indices = time_call(lambda: lttb(x, y, n_out), args.repeat)
+        entry = {
+            "size": args.size,
+            "points": n_out,
+            "numpy_ms": round(seconds * 1000, 2),
+            "raw_json_bytes": raw_bytes,
+            "decimated_json_bytes": len(json.dumps({"t": x[indices].tolist(), "v": y[indices].tolist()})),
+        }
+        if not args.skip_reference:
+            ref_seconds, ref_indices = time_call(lambda: lttb_reference(x_list, y_list, n_out), 1)
+            entry["python_ms"] = round(ref_seconds * 1000, 2)
+            entry["speedup"] = round(ref_seconds / seconds, 1)
+            # Near-equal triangle areas can round differently in numpy and Python sums
+            same = sum(1 for a, b in zip(indices.tolist(), ref_indices) if a == b)
+            entry["matching_points"] = round(same / len(ref_indices), 4)
+        results.append(entry)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""
+GreenBharat AI — Benchmark Helpers
+Shared statistics helpers for the benchmark scripts.
+"""
+
+
+def percentile(values, pct):
+    """Return the pct-th percentile of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize_ms(latencies):
+    """Summarize a list of latencies in seconds as p50/p99/mean milliseconds."""
+    if not latencies:
+        return {"count": 0, "p50_ms": None, "p99_ms": None, "mean_ms": None}
+    return {
+        "count": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+    }
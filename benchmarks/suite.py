@@ -0,0 +1,348 @@
+"""
+GreenBharat AI — End-to-End Benchmark Suite
+Reproducible simulator → pipeline → API → RAG benchmarks.
+
+For each dataset size a fixed-seed sensor CSV is generated with the data
+simulator (cached under benchmarks/data/), then:
+  * pipeline — src.pipeline.pipeline runs over it in static mode; wall time,
+                rows/s and peak RSS are recorded (skipped if Pathway is missing)
+  * api      — a fresh API server process ingests the CSV and serves
+                /api/aqi, /api/trends, /api/alerts and /api/summary through the
+                Flask test client; p50/p99 latency with the response cache
+                cleared (cold), served from it (warm) and revalidated with
+                the ETag (not_modified), body size and peak RSS
+  * rag      — in-process knowledge base query latency, plus a live RAG server
+                if --rag-url is given
+
+Results are written as JSON (default benchmarks/results/<commit>.json) for
+comparison between commits.
+
+Memory: peak RSS grows with history, about 1 KB per row in the API worker and
+about 2.4 KB per row in the pipeline (measured at 1M rows: 983 MB and 2.4 GB).
+The 10m tier therefore needs roughly 10 GB for the API and 24 GB for the
+pipeline; run it only on a machine with that much memory.
+
+Usage:
+    python -m benchmarks.suite run --sizes 10k,1m
+    python -m benchmarks.suite run --sizes 10k,1m,10m --requests 10
+    python -m benchmarks.suite compare benchmarks/results/base.json benchmarks/results/new.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.common import summarize_ms
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT_DIR, "benchmarks")
+DATASET_DIR = os.path.join(BENCH_DIR, "data")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}  # 10m: see the memory note above
+API_ENDPOINTS = ["/api/aqi", "/api/trends?limit=200", "/api/alerts", "/api/summary"]
+RAG_QUERIES = [
+    "what is the who guideline for pm2.5",
+    "health effects of nitrogen dioxide",
+    "how is aqi calculated",
+    "delhi winter aqi stubble burning",
+    "how can i reduce pollution from transportation",
+    "rooftop solar subsidy scheme",
+]
+
+
+def git_commit():
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, text=True).strip()
+        dirty = bool(subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"],
+                                             cwd=ROOT_DIR, text=True).strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def run_child(args, timeout=None):
+    """Run a child Python process; return (returncode, stdout, stderr, wall_s, peak_rss_mb)."""
+    with tempfile.TemporaryFile("w+") as out, tempfile.TemporaryFile("w+") as err:
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable] + args, cwd=ROOT_DIR, stdout=out, stderr=err, text=True)
+        deadline = None if timeout is None else start + timeout
+        # Reap with wait4 so the peak RSS belongs to this child alone
+        while True:
+            pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+            if pid:
+                break
+            if deadline is not None and time.perf_counter() > deadline:
+                proc.kill()
+                pid, status, usage = os.wait4(proc.pid, 0)
+                break
+            time.sleep(0.05)
+        wall = time.perf_counter() - start
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        out.seek(0)
+        err.seek(0)
+        return proc.returncode, out.read(), err.read(), wall, round(usage.ru_maxrss / 1024, 1)
+
+
+# --- Datasets ---
+
+def ensure_dataset(name, size, seed):
+    """Generate (or reuse) the fixed-seed CSV for a dataset size."""
+    from src.simulator.data_simulator import write_dataset
+
+    directory = os.path.join(DATASET_DIR, f"{name}-seed{seed}")
+    path = os.path.join(directory, "sensor_data.csv")
+    info = {"rows": size, "path": os.path.relpath(path, ROOT_DIR), "generate_s": 0.0}
+    if not os.path.exists(path):
+        print(f"[BENCH] Generating {size:,} readings (seed {seed})...")
+        start = time.perf_counter()
+        tmp_path = path + ".tmp"
+        write_dataset(tmp_path, size, seed=seed)
+        os.replace(tmp_path, path)
+        info["generate_s"] = round(time.perf_counter() - start, 3)
+    info["bytes"] = os.path.getsize(path)
+    return directory, path, info
+
+
+# --- Pipeline ---
+
+def bench_pipeline(data_dir, rows, timeout):
+    try:
+        import pathway  # noqa: F401
+    except ImportError:
+        return {"status": "skipped", "reason": "pathway is not installed"}
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        code, stdout, stderr, wall, peak_mb = run_child(
+            ["-m", "src.pipeline.pipeline", "--data-dir", data_dir, "--output-dir", output_dir, "--static"],
+            timeout=timeout,
+        )
+        if code != 0:
+            return {"status": "failed", "returncode": code, "stderr": stderr[-2000:]}
+        output_rows = 0
+        readings_path = os.path.join(output_dir, "all_readings.jsonl")
+        if os.path.exists(readings_path):
+            with open(readings_path, "rb") as f:
+                output_rows = sum(1 for _ in f)
+    return {
+        "status": "ok",
+        "wall_s": round(wall, 3),
+        "rows_per_s": round(rows / wall, 1),
+        "output_rows": output_rows,
+        "peak_rss_mb": peak_mb,
+    }
+
+
+# --- API ---
+
+def api_worker(data_dir, requests_per_endpoint):
+    """Runs in a child process: ingest data_dir/sensor_data.csv and time the dashboard endpoints."""
+    # Point the server at the dataset and a scratch output dir before it is imported,
+    # so it never touches the real alert log or pipeline outputs
+    os.environ["GREENBHARAT_DATA_DIR"] = data_dir
+    os.environ["GREENBHARAT_OUTPUT_DIR"] = tempfile.mkdtemp()
+    from src.backend import api_server
+
+    start = time.perf_counter()
+    api_server.read_csv_data()
+    ingest_s = time.perf_counter() - start
+
+    client = api_server.app.test_client()
+    endpoints = {}
+    for endpoint in API_ENDPOINTS:
+        # cold: response cache cleared before every request, so the view runs
+        cold = []
+        for _ in range(requests_per_endpoint):
+            api_server.response_cache.clear()
+            start = time.perf_counter()
+            resp = client.get(endpoint)
+            cold.append(time.perf_counter() - start)
+        size, status, etag = len(resp.data), resp.status_code, resp.headers.get("ETag")
+
+        # warm: served from the response cache; not_modified: revalidated with the ETag
+        warm, not_modified = [], []
+        for _ in range(requests_per_endpoint):
+            start = time.perf_counter()
+            client.get(endpoint)
+            warm.append(time.perf_counter() - start)
+            if etag:
+                start = time.perf_counter()
+                client.get(endpoint, headers={"If-None-Match": etag})
+                not_modified.append(time.perf_counter() - start)
+
+        endpoints[endpoint] = {
+            "cold": summarize_ms(cold),
+            "warm": summarize_ms(warm),
+            "bytes": size,
+            "status": status,
+        }
+        if not_modified:
+            endpoints[endpoint]["not_modified"] = summarize_ms(not_modified)
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        "ingest_s": round(ingest_s, 3),
+        "rows": len(api_server.sensor_store.records),
+        "endpoints": endpoints,
+        "peak_rss_mb": round(peak_kb / 1024, 1),
+    }))
+
+
+def bench_api(data_dir, requests_per_endpoint, timeout):
+    code, stdout, stderr, wall, _ = run_child(
+        ["-m", "benchmarks.suite", "api-worker", data_dir, "--requests", str(requests_per_endpoint)],
+        timeout=timeout,
+    )
+    if code != 0:
+        return {"status": "failed", "returncode": code, "stderr": stderr[-2000:]}
+    result = json.loads(stdout.strip().splitlines()[-1])
+    result["status"] = "ok"
+    return result
+
+
+# --- RAG ---
+
+def bench_rag(repeat, rag_url=None):
+    from benchmarks.bench_knowledge import KNOWLEDGE_DIR
+    from src.backend.knowledge_base import load_knowledge_base, search_knowledge, generate_answer
+
+    start = time.perf_counter()
+    knowledge_base = load_knowledge_base(KNOWLEDGE_DIR)
+    result = {"load_s": round(time.perf_counter() - start, 4), "chunks": len(knowledge_base)}
+
+    latencies = []
+    for _ in range(repeat):
+        for query in RAG_QUERIES:
+            start = time.perf_counter()
+            generate_answer(query, search_knowledge(knowledge_base, query))
+            latencies.append(time.perf_counter() - start)
+    result["local"] = summarize_ms(latencies)
+
+    if rag_url:
+        import requests
+
+        session = requests.Session()
+        latencies = []
+        try:
+            for _ in range(max(1, repeat // 10)):
+                for query in RAG_QUERIES:
+                    start = time.perf_counter()
+                    session.post(f"{rag_url.rstrip('/')}/v1/answer", json={"query": query}, timeout=30)
+                    latencies.append(time.perf_counter() - start)
+            result["server"] = summarize_ms(latencies)
+        except requests.RequestException as e:
+            result["server"] = {"status": "failed", "error": str(e)}
+    return result
+
+
+# --- Commands ---
+
+def run(args):
+    sizes = [s.strip().lower() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        raise SystemExit(f"Unknown sizes {unknown}; choose from {list(SIZES)}")
+
+    commit, dirty = git_commit()
+    results = {
+        "meta": {
+            "commit": commit,
+            "dirty": dirty,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "sizes": sizes,
+            "requests_per_endpoint": args.requests,
+        },
+        "datasets": {},
+        "pipeline": {},
+        "api": {},
+    }
+
+    for name in sizes:
+        data_dir, _, info = ensure_dataset(name, SIZES[name], args.seed)
+        results["datasets"][name] = info
+        if not args.skip_pipeline:
+            print(f"[BENCH] Pipeline on {name}...")
+            results["pipeline"][name] = bench_pipeline(data_dir, SIZES[name], args.timeout)
+        if not args.skip_api:
+            print(f"[BENCH] API on {name}...")
+            results["api"][name] = bench_api(data_dir, args.requests, args.timeout)
+
+    print("[BENCH] RAG queries...")
+    results["rag"] = bench_rag(args.rag_repeat, args.rag_url)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{(commit or 'unknown')[:12]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"[BENCH] Results written to {out}")
+
+
+def _flatten(obj, prefix=""):
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            yield from _flatten(value, f"{prefix}.{key}" if prefix else key)
+    elif isinstance(obj, (int, float)) and not isinstance(obj, bool):
+        yield prefix, obj
+
+
+def compare(args):
+    with open(args.base, "r", encoding="utf-8") as f:
+        base = dict(_flatten(json.load(f)))
+    with open(args.new, "r", encoding="utf-8") as f:
+        new = dict(_flatten(json.load(f)))
+
+    metric_suffixes = ("_ms", "_s", "_per_s", "_mb", "bytes")
+    print(f"{'metric':70} {'base':>12} {'new':>12} {'change':>9}")
+    for key in sorted(set(base) & set(new)):
+        if key.startswith("meta.") or not key.endswith(metric_suffixes):
+            continue
+        old, cur = base[key], new[key]
+        change = f"{100 * (cur - old) / old:+8.1f}%" if old else "      n/a"
+        print(f"{key:70} {old:12.3f} {cur:12.3f} {change:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="run the suite and write JSON results")
+    run_parser.add_argument("--sizes", default="10k,1m", help=f"comma-separated, from {','.join(SIZES)}")
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--requests", type=int, default=20, help="requests per API endpoint")
+    run_parser.add_argument("--rag-repeat", type=int, default=100)
+    run_parser.add_argument("--rag-url", default=None, help="also time a running RAG server")
+    run_parser.add_argument("--timeout", type=float, default=3600, help="per child process (s)")
+    run_parser.add_argument("--skip-pipeline", action="store_true")
+    run_parser.add_argument("--skip-api", action="store_true")
+    run_parser.add_argument("--out", default=None)
+
+    compare_parser = sub.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+
+    worker_parser = sub.add_parser("api-worker", help=argparse.SUPPRESS)
+    worker_parser.add_argument("data_dir")
+    worker_parser.add_argument("--requests", type=int, default=20)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    elif args.command == "compare":
+        compare(args)
+    else:
+        api_worker(args.data_dir, args.requests)
+
+
+if __name__ == "__main__":
+    main()
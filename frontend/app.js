@@ -5,6 +5,8 @@
 
 const API_BASE = window.location.origin + "/api";
 const REFRESH_INTERVAL = 3000;
+const TREND_READINGS = 1000;  // readings per city covered by the trend charts
+const TREND_POINTS = 48;      // LTTB-decimated points per city and series
 
 // Chart instances
 let aqiBarChart = null;
@@ -18,6 +20,8 @@ let cityRadar = null;
 
 // Store latest city data globally
 let latestCities = [];
+let alertCursor = null;
+let alertFeedItems = [];
 
 // Chart.js global config
 Chart.defaults.color = '#94a3b8';
@@ -460,87 +464,83 @@ async function updateCharts(cities) {
 }
 
 async function updateTrendCharts() {
-    const data = await fetchJSON('/trends?limit=200');
-    if (!data || !data.trends || data.trends.length === 0) return;
-
-    const trends = data.trends;
-    const cityTrends = {};
-    trends.forEach(t => {
-        if (!cityTrends[t.city]) cityTrends[t.city] = [];
-        cityTrends[t.city].push(t);
-    });
+    // Server-side LTTB keeps long ranges down to TREND_POINTS per series.
+    // Each city is decimated on its own, so points are plotted against their
+    // timestamps rather than their index.
+    const data = await fetchJSON(
+        `/trends?points=${TREND_POINTS}&limit=${TREND_READINGS}&fields=aqi,pm25,temperature,humidity`);
+    if (!data || !data.series || Object.keys(data.series).length === 0) return;
+
+    const citySeries = data.series;
+    const seriesPoints = (series, field) => {
+        const s = series[field];
+        if (!s) return [];
+        return s.timestamps.map((ts, i) => ({ x: Date.parse(ts), y: s.values[i] }));
+    };
+    const timeAxis = {
+        type: 'linear', display: true,
+        grid: { display: false },
+        ticks: { maxTicksLimit: 5, font: { size: 9 }, callback: v => formatTime(v) },
+    };
+    const timeTooltip = { callbacks: { title: items => (items.length ? formatTime(items[0].parsed.x) : '') } };
 
     // --- PM2.5 Line Chart ---
     const pm25Datasets = [];
-    Object.entries(cityTrends).forEach(([city, trs]) => {
-        const last25 = trs.slice(-25);
+    Object.entries(citySeries).forEach(([city, series]) => {
         pm25Datasets.push({
-            label: city, data: last25.map(t => t.pm25),
+            label: city, data: seriesPoints(series, 'pm25'),
             borderColor: cityColors[city] || '#94a3b8', backgroundColor: 'transparent',
             borderWidth: 2, tension: 0.4, pointRadius: 0, pointHoverRadius: 4,
         });
     });
-    const maxPts = Math.max(...Object.values(cityTrends).map(t => Math.min(t.length, 25)));
-    const pm25Labels = Array.from({ length: maxPts }, (_, i) => i + 1);
     const pm25Ctx = document.getElementById('pm25LineChart').getContext('2d');
 
     if (pm25LineChart) {
-        pm25LineChart.data.labels = pm25Labels;
         pm25LineChart.data.datasets = pm25Datasets;
         pm25LineChart.update('none');
     } else {
         pm25LineChart = new Chart(pm25Ctx, {
             type: 'line',
-            data: { labels: pm25Labels, datasets: pm25Datasets },
+            data: { datasets: pm25Datasets },
             options: {
                 responsive: true, maintainAspectRatio: false,
-                interaction: { mode: 'index', intersect: false },
-                plugins: { legend: { labels: { usePointStyle: true, pointStyleWidth: 8, font: { size: 9 }, padding: 8 } } },
-                scales: { x: { display: false }, y: { grid: { color: 'rgba(255,255,255,0.04)' }, title: { display: true, text: 'PM2.5 (μg/m³)', font: { size: 10 } } } }
+                interaction: { mode: 'nearest', axis: 'x', intersect: false },
+                plugins: { legend: { labels: { usePointStyle: true, pointStyleWidth: 8, font: { size: 9 }, padding: 8 } }, tooltip: timeTooltip },
+                scales: { x: timeAxis, y: { grid: { color: 'rgba(255,255,255,0.04)' }, title: { display: true, text: 'PM2.5 (μg/m³)', font: { size: 10 } } } }
             }
         });
     }
 
     // --- Weather Chart ---
     const weatherDatasets = [];
-    Object.entries(cityTrends).forEach(([city, trs]) => {
-        const last18 = trs.slice(-18);
+    Object.entries(citySeries).forEach(([city, series]) => {
         weatherDatasets.push({
-            label: `${city}`, data: last18.map(t => t.temperature),
+            label: `${city}`, data: seriesPoints(series, 'temperature'),
             borderColor: cityColors[city] || '#94a3b8', backgroundColor: 'transparent',
             borderWidth: 2, tension: 0.4, pointRadius: 0, yAxisID: 'y',
         });
     });
-    const avgHumidity = [];
-    for (let i = 0; i < 18; i++) {
-        let sum = 0, count = 0;
-        Object.values(cityTrends).forEach(trs => {
-            const idx = trs.length - 18 + i;
-            if (idx >= 0 && idx < trs.length) { sum += trs[idx].humidity; count++; }
-        });
-        avgHumidity.push(count ? sum / count : 0);
-    }
     weatherDatasets.push({
-        label: 'Avg Humidity', data: avgHumidity,
+        label: 'Avg Humidity',
+        data: averageOnTimeGrid(Object.values(citySeries).map(s => seriesPoints(s, 'humidity')), TREND_POINTS),
         borderColor: 'rgba(6,182,212,0.5)', backgroundColor: 'rgba(6,182,212,0.06)',
         borderWidth: 1.5, fill: true, tension: 0.4, pointRadius: 0, yAxisID: 'y1',
     });
     const weatherCtx = document.getElementById('weatherChart').getContext('2d');
 
     if (weatherChart) {
-        weatherChart.data.labels = Array.from({ length: 18 }, (_, i) => i + 1);
         weatherChart.data.datasets = weatherDatasets;
         weatherChart.update('none');
     } else {
         weatherChart = new Chart(weatherCtx, {
             type: 'line',
-            data: { labels: Array.from({ length: 18 }, (_, i) => i + 1), datasets: weatherDatasets },
+            data: { datasets: weatherDatasets },
             options: {
                 responsive: true, maintainAspectRatio: false,
-                interaction: { mode: 'index', intersect: false },
-                plugins: { legend: { labels: { usePointStyle: true, pointStyleWidth: 8, font: { size: 9 }, padding: 6 } } },
+                interaction: { mode: 'nearest', axis: 'x', intersect: false },
+                plugins: { legend: { labels: { usePointStyle: true, pointStyleWidth: 8, font: { size: 9 }, padding: 6 } }, tooltip: timeTooltip },
                 scales: {
-                    x: { display: false },
+                    x: timeAxis,
                     y: { type: 'linear', position: 'left', grid: { color: 'rgba(255,255,255,0.04)' }, title: { display: true, text: 'Temp °C', font: { size: 10 } } },
                     y1: { type: 'linear', position: 'right', grid: { drawOnChartArea: false }, title: { display: true, text: 'Humidity %', font: { size: 10 } }, min: 0, max: 100 }
                 }
@@ -550,32 +550,29 @@ async function updateTrendCharts() {
 
     // --- AQI Area Chart ---
     const areaDatasets = [];
-    Object.entries(cityTrends).forEach(([city, trs]) => {
-        const last20 = trs.slice(-20);
+    Object.entries(citySeries).forEach(([city, series]) => {
         const col = cityColors[city] || '#94a3b8';
         areaDatasets.push({
-            label: city, data: last20.map(t => t.aqi),
+            label: city, data: seriesPoints(series, 'aqi'),
             borderColor: col, backgroundColor: col + '12',
             borderWidth: 2, fill: true, tension: 0.4, pointRadius: 0,
         });
     });
-    const areaLabels = Array.from({ length: 20 }, (_, i) => i + 1);
     const areaCtx = document.getElementById('aqiAreaChart').getContext('2d');
 
     if (aqiAreaChart) {
-        aqiAreaChart.data.labels = areaLabels;
         aqiAreaChart.data.datasets = areaDatasets;
         aqiAreaChart.update('none');
     } else {
         aqiAreaChart = new Chart(areaCtx, {
             type: 'line',
-            data: { labels: areaLabels, datasets: areaDatasets },
+            data: { datasets: areaDatasets },
             options: {
                 responsive: true, maintainAspectRatio: false,
-                interaction: { mode: 'index', intersect: false },
-                plugins: { legend: { labels: { usePointStyle: true, pointStyleWidth: 8, font: { size: 9 }, padding: 8 } } },
+                interaction: { mode: 'nearest', axis: 'x', intersect: false },
+                plugins: { legend: { labels: { usePointStyle: true, pointStyleWidth: 8, font: { size: 9 }, padding: 8 } }, tooltip: timeTooltip },
                 scales: {
-                    x: { display: false },
+                    x: timeAxis,
                     y: { grid: { color: 'rgba(255,255,255,0.04)' }, beginAtZero: true, title: { display: true, text: 'AQI', font: { size: 10 } } }
                 }
             }
@@ -583,20 +580,67 @@ async function updateTrendCharts() {
     }
 }
 
+function formatTime(ms) {
+    return new Date(ms).toLocaleTimeString('en-IN', { hour: '2-digit', minute: '2-digit' });
+}
+
+// Linearly interpolate sorted {x, y} points at time t; null outside their range
+function interpolateAt(points, t) {
+    if (!points.length || t < points[0].x || t > points[points.length - 1].x) return null;
+    let hi = 0;
+    while (points[hi].x < t) hi++;
+    if (points[hi].x === t || hi === 0) return points[hi].y;
+    const lo = points[hi - 1];
+    const frac = (t - lo.x) / (points[hi].x - lo.x);
+    return lo.y + frac * (points[hi].y - lo.y);
+}
+
+// Average several independently sampled series on a shared, evenly spaced time grid
+function averageOnTimeGrid(seriesList, steps) {
+    const nonEmpty = seriesList.filter(points => points.length);
+    if (!nonEmpty.length) return [];
+    const start = Math.min(...nonEmpty.map(points => points[0].x));
+    const end = Math.max(...nonEmpty.map(points => points[points.length - 1].x));
+    const stepMs = steps > 1 ? (end - start) / (steps - 1) : 0;
+    const averaged = [];
+    for (let i = 0; i < steps; i++) {
+        const t = start + i * stepMs;
+        let sum = 0, count = 0;
+        nonEmpty.forEach(points => {
+            const y = interpolateAt(points, t);
+            if (y !== null) { sum += y; count++; }
+        });
+        if (count) averaged.push({ x: t, y: sum / count });
+        if (stepMs === 0) break;
+    }
+    return averaged;
+}
+
 async function updateAlerts() {
-    const data = await fetchJSON('/alerts');
+    // Poll with the cursor so only alerts newer than the last response are sent
+    const endpoint = alertCursor === null ? '/alerts?limit=30' : `/alerts?since=${alertCursor}&limit=30`;
+    const data = await fetchJSON(endpoint);
     if (!data || !data.alerts) return;
 
+    if (alertCursor !== null && (data.has_more || data.gap)) {
+        // Fell too far behind — start again from the newest alerts
+        alertCursor = null;
+        alertFeedItems = [];
+        return updateAlerts();
+    }
+    alertCursor = data.next_cursor;
+    alertFeedItems = data.alerts.concat(alertFeedItems).slice(0, 30);
+
     const feed = document.getElementById('alertFeed');
     document.getElementById('alertTotal').textContent = `${data.total || 0} alerts`;
 
-    if (data.alerts.length === 0) {
+    if (alertFeedItems.length === 0) {
         feed.innerHTML = '<div class="loading-placeholder">No anomalies detected — air quality within safe limits ✅</div>';
         return;
     }
 
     feed.innerHTML = '';
-    data.alerts.slice(0, 30).forEach(alert => {
+    alertFeedItems.forEach(alert => {
         const item = document.createElement('div');
         item.className = 'alert-item';
         item.innerHTML = `
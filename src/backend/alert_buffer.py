@@ -0,0 +1,297 @@
+"""
+GreenBharat AI — Alert Buffer
+Bounded, indexed store of anomaly alerts populated at ingest.
+Alerts get increasing ids that double as pagination cursors. Recent alerts
+are kept in fixed-size rings per (city, alert_type) filter so a page costs
+O(log capacity + page size) regardless of history length; every alert is
+also appended to a JSONL log that is replayed on restart.
+
+The id/row watermarks, the source fingerprint, per-filter totals and
+eviction points live in a small JSON state file next to the log, so the log
+only has to hold what the rings hold: once it grows to twice that, it is
+rewritten down to the alerts still retained, keeping startup time and disk
+use bounded by `capacity` rather than by history length.
+
+A cursor older than the oldest alert still held in memory gets the oldest
+retained alerts plus a `gap` flag, so clients know some were skipped.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+DEFAULT_CAPACITY = 5000  # alerts kept in memory per filter key
+
+
+def source_fingerprint(record):
+    """Identify a sensor file by its first row, to detect replaced files."""
+    raw = json.dumps(dict(record), sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=8).hexdigest()
+
+
+def classify_alert(record):
+    """Return an alert dict for an anomalous sensor row, or None."""
+    try:
+        aqi = int(float(record.get("aqi", 0)))
+        pm25 = float(record.get("pm25", 0))
+    except (TypeError, ValueError):
+        return None
+    if not (aqi > 200 or pm25 > 60):
+        return None
+    alert_type = "CRITICAL" if aqi > 300 else "WARNING" if aqi > 200 else "CAUTION"
+    return {
+        "timestamp": record.get("timestamp", ""),
+        "city": record.get("city", ""),
+        "aqi": aqi,
+        "pm25": pm25,
+        "aqi_category": record.get("aqi_category", ""),
+        "alert_type": alert_type,
+    }
+
+
+class _Ring:
+    """Fixed-capacity ring of alerts in increasing id order with O(1) indexing."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._items = []
+        self._head = 0  # index of the oldest item once the ring is full
+        self.evicted_id = 0  # id of the newest alert pushed out of the ring
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, i):
+        return self._items[(self._head + i) % self.capacity]
+
+    def append(self, item):
+        if len(self._items) < self.capacity:
+            self._items.append(item)
+        else:
+            self.evicted_id = self._items[self._head]["id"]
+            self._items[self._head] = item
+            self._head = (self._head + 1) % self.capacity
+
+    def first_after(self, alert_id):
+        """Index of the first alert with id > alert_id (binary search)."""
+        lo, hi = 0, len(self._items)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self[mid]["id"] <= alert_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+
+class AlertBuffer:
+    """Recent alerts indexed by city and alert type, backed by a durable log."""
+
+    def __init__(self, log_path=None, capacity=DEFAULT_CAPACITY):
+        self.log_path = log_path
+        self.capacity = capacity
+        self.last_id = 0
+        self._rings = {}  # (city or None, alert_type or None) -> _Ring
+        self._counts = {}  # same keys -> alerts ever recorded
+        self._last_row = -1  # highest source row index already turned into alerts
+        self._source = None  # fingerprint of the source file _last_row refers to
+        self._log_lines = 0  # alerts currently in the log file
+        self._compact_at = 2 * capacity  # log length that triggers the next compaction
+        self._lock = threading.Lock()
+        self.state_path = f"{log_path}.state" if log_path else None
+        if log_path:
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        self._load_log()
+
+    def _load_log(self):
+        """Restore recent alerts, totals and watermarks from the state file and log."""
+        if not self.log_path:
+            return
+        state = self._read_state()
+        state_id = 0
+        evicted = {}
+        if state:
+            state_id = state.get("last_id", 0)
+            self.last_id = state_id
+            self._last_row = state.get("last_row", -1)
+            self._source = state.get("source")
+            for city, alert_type, count, evicted_id in state.get("keys", []):
+                key = (city, alert_type)
+                self._counts[key] = count
+                evicted[key] = evicted_id
+        if os.path.exists(self.log_path):
+            self._replay_log(state_id)
+        for key, evicted_id in evicted.items():
+            # The compacted log no longer holds every evicted alert
+            ring = self._rings.get(key)
+            if ring is not None:
+                ring.evicted_id = max(ring.evicted_id, evicted_id)
+        self._maybe_compact()
+        self._save_state()
+
+    def _replay_log(self, state_id):
+        """Index the logged alerts; those newer than state_id also update totals."""
+        try:
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        alert = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self._index(alert)
+                    self._log_lines += 1
+                    if alert.get("id", 0) > state_id:
+                        # Appended after the state was last saved (or no state
+                        # file yet): totals and watermarks come from the log
+                        self._count(alert)
+                        self.last_id = max(self.last_id, alert.get("id", 0))
+                        self._last_row = alert.get("row", self._last_row)
+                        self._source = alert.get("source", self._source)
+        except Exception as e:
+            print(f"[API] Error reading alert log: {e}")
+
+    def _read_state(self):
+        """The saved state dict, or None if there is none yet."""
+        if not os.path.exists(self.state_path):
+            return None
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[API] Error reading alert state: {e}")
+            return None
+
+    def _save_state(self):
+        """Atomically write watermarks, totals and eviction points."""
+        if not self.state_path:
+            return
+        state = {
+            "last_id": self.last_id,
+            "last_row": self._last_row,
+            "source": self._source,
+            "keys": [
+                [city, alert_type, count, getattr(self._rings.get((city, alert_type)), "evicted_id", 0)]
+                for (city, alert_type), count in self._counts.items()
+            ],
+        }
+        tmp_path = f"{self.state_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+        except Exception as e:
+            print(f"[API] Error writing alert state: {e}")
+
+    def _maybe_compact(self):
+        """Rewrite the log down to the alerts the rings still hold, once it has doubled."""
+        if self._log_lines < self._compact_at:
+            return
+        retained = {}
+        for ring in self._rings.values():
+            for i in range(len(ring)):
+                alert = ring[i]
+                retained[alert["id"]] = alert
+        self._compact_at = 2 * max(len(retained), self.capacity)
+        if self._log_lines < self._compact_at:
+            return
+        tmp_path = f"{self.log_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(retained[i]) + "\n" for i in sorted(retained))
+            os.replace(tmp_path, self.log_path)
+            self._log_lines = len(retained)
+        except Exception as e:
+            print(f"[API] Error compacting alert log: {e}")
+
+    def _keys(self, alert):
+        city, alert_type = alert["city"], alert["alert_type"]
+        return ((None, None), (city, None), (None, alert_type), (city, alert_type))
+
+    def _count(self, alert):
+        for key in self._keys(alert):
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def _index(self, alert):
+        for key in self._keys(alert):
+            ring = self._rings.get(key)
+            if ring is None:
+                ring = self._rings[key] = _Ring(self.capacity)
+            ring.append(alert)
+
+    def ingest(self, rows, first_row):
+        """Record alerts for new sensor rows; first_row is the index of rows[0]."""
+        new_alerts = []
+        with self._lock:
+            if first_row == 0 and rows:
+                source = source_fingerprint(rows[0])
+                if source != self._source:
+                    # A different file than the logged watermark refers to
+                    # (e.g. replaced while the server was down)
+                    if self._source is not None:
+                        self._last_row = -1
+                    self._source = source
+            for offset, record in enumerate(rows):
+                row = first_row + offset
+                if row <= self._last_row:
+                    continue  # already logged before a restart
+                self._last_row = row
+                alert = classify_alert(record)
+                if alert is None:
+                    continue
+                self.last_id += 1
+                alert["id"] = self.last_id
+                alert["row"] = row
+                alert["source"] = self._source
+                self._count(alert)
+                self._index(alert)
+                new_alerts.append(alert)
+
+            if new_alerts and self.log_path:
+                try:
+                    with open(self.log_path, "a", encoding="utf-8") as f:
+                        f.writelines(json.dumps(a) + "\n" for a in new_alerts)
+                    self._log_lines += len(new_alerts)
+                except Exception as e:
+                    print(f"[API] Error writing alert log: {e}")
+                self._maybe_compact()
+            if rows:
+                self._save_state()
+        return new_alerts
+
+    def reset_rows(self):
+        """Source file was truncated; row indices start again from zero."""
+        with self._lock:
+            self._last_row = -1
+            self._source = None
+            self._save_state()
+
+    def page(self, since=None, city=None, alert_type=None, limit=50):
+        """Return (alerts newest first, total matching, has_more, gap).
+
+        Without a cursor this is the newest `limit` alerts. With `since`, it is
+        the oldest `limit` alerts after that id, so a polling client that
+        follows the cursor never skips any — unless alerts after `since` have
+        already been evicted from memory, which is reported as gap=True.
+        """
+        key = (city or None, alert_type or None)
+        with self._lock:
+            ring = self._rings.get(key)
+            total = self._counts.get(key, 0)
+            if ring is None or limit <= 0:
+                return [], total, False, False
+            gap = False
+            if since is None:
+                start = max(0, len(ring) - limit)
+                end = len(ring)
+                has_more = start > 0
+            else:
+                start = ring.first_after(since)
+                end = min(len(ring), start + limit)
+                has_more = end < len(ring)
+                gap = since < ring.evicted_id
+            alerts = [ring[i] for i in range(end - 1, start - 1, -1)]
+        return alerts, total, has_more, gap
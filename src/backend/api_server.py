@@ -4,39 +4,101 @@ Bridges Pathway pipeline outputs to the frontend dashboard.
 Reads JSONL output files and serves them as JSON API endpoints.
 """
 
+import math
 import os
 import json
 import time
-import requests
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, g
 from flask_cors import CORS
 from collections import defaultdict
 
+from src.backend.alert_buffer import AlertBuffer
+from src.backend.geo_index import StationIndex
+from src.backend.knowledge_base import load_knowledge_base, search_knowledge, generate_answer
+from src.backend.rag_client import RagClient
+from src.backend.response_cache import ResponseCache
+from src.backend.sensor_store import SensorStore, FILE_READ_BYTES
+from src.backend.trend_series import TrendSeries, TREND_FIELDS
+from src.metrics import REGISTRY, metrics_response
+from src.profiling import stage, record_stage, enable_from_env, install_flask_profiling
+
 app = Flask(__name__, static_folder="frontend")
 CORS(app)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-OUTPUT_DIR = os.path.join(BASE_DIR, "output")
-DATA_DIR = os.path.join(BASE_DIR, "data")
+# Overridable so benchmarks and tests can point the server at other files
+OUTPUT_DIR = os.environ.get("GREENBHARAT_OUTPUT_DIR", os.path.join(BASE_DIR, "output"))
+DATA_DIR = os.environ.get("GREENBHARAT_DATA_DIR", os.path.join(BASE_DIR, "data"))
+ROOT_DIR = os.path.dirname(os.path.dirname(BASE_DIR))
+KNOWLEDGE_DIR = os.path.join(ROOT_DIR, "knowledge")
 RAG_URL = "http://localhost:8011"
+MAX_GRID_SIZE = 128  # max rows/cols for interpolated AQI grids
+MAX_ALERTS_PAGE = 500
+MAX_TREND_POINTS = 5000  # max decimated points per city and series
+
+# Pooled client for the RAG server, plus an in-process retriever to fall back on
+rag_client = RagClient(RAG_URL)
+_local_knowledge = None
 
-# Cache for parsed JSONL data
+# Cache for parsed JSONL data, invalidated when the file changes
 _cache = {}
-_cache_time = {}
-CACHE_TTL = 2  # seconds
+_cache_sig = {}
+
+# --- Metrics ---
+REQUEST_SECONDS = REGISTRY.histogram(
+    "api_request_duration_seconds", "API request latency by endpoint.", ["endpoint", "method", "status"])
+CACHE_REQUESTS = REGISTRY.counter(
+    "api_cache_requests_total", "Cache lookups by cache and result.", ["cache", "result"])
+ASK_ANSWERS = REGISTRY.counter(
+    "api_ask_answers_total", "Answers served by /api/ask by source.", ["source"])
+LOCAL_RETRIEVAL_SECONDS = REGISTRY.histogram(
+    "api_local_retrieval_duration_seconds", "In-process knowledge base search latency.")
+STATIONS_INDEXED = REGISTRY.gauge("api_stations_indexed", "Stations in the spatial index.")
+ALERTS_LAST_ID = REGISTRY.gauge("api_alerts_last_id", "Id of the most recent alert.")
+RAG_BREAKER_OPEN = REGISTRY.gauge("api_rag_breaker_open", "1 while the RAG circuit breaker is skipping calls.")
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_latency(response):
+    start = g.pop("request_start", None)
+    if start is not None:
+        elapsed = time.perf_counter() - start
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUEST_SECONDS.observe(
+            elapsed, endpoint=endpoint, method=request.method, status=str(response.status_code),
+        )
+        record_stage(f"handler {request.method} {endpoint}", elapsed)
+    return response
+
+
+def file_signature(filepath):
+    """Return (mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
 
 
 def read_jsonl(filename):
     """Read a JSONL file and return list of dicts, with caching."""
     filepath = os.path.join(OUTPUT_DIR, filename)
-    now = time.time()
+    signature = file_signature(filepath)
 
-    if filename in _cache and now - _cache_time.get(filename, 0) < CACHE_TTL:
+    if filename in _cache and _cache_sig.get(filename) == signature:
+        CACHE_REQUESTS.inc(cache="jsonl", result="hit")
         return _cache[filename]
+    CACHE_REQUESTS.inc(cache="jsonl", result="miss")
 
     records = []
     if os.path.exists(filepath):
         try:
+            FILE_READ_BYTES.inc(os.path.getsize(filepath), file=filename)
             with open(filepath, "r", encoding="utf-8") as f:
                 for line in f:
                     line = line.strip()
@@ -50,40 +112,138 @@ def read_jsonl(filename):
             print(f"[API] Error reading {filename}: {e}")
 
     _cache[filename] = records
-    _cache_time[filename] = now
+    _cache_sig[filename] = signature
     return records
 
 
+# Sensor CSV is ingested incrementally; indexes are maintained as rows arrive
+sensor_store = SensorStore(os.path.join(DATA_DIR, "sensor_data.csv"))
+station_index = StationIndex()
+alert_buffer = AlertBuffer(os.path.join(OUTPUT_DIR, "api_alerts_log.jsonl"))
+trend_series = TrendSeries()
+latest_by_city = {}  # city -> latest sensor row, in order of first appearance
+
+
+def index_stations(rows):
+    """Keep the spatial index pointed at each station's latest reading."""
+    for row in rows:
+        try:
+            lat, lon = float(row["latitude"]), float(row["longitude"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if not (math.isfinite(lat) and math.isfinite(lon)):
+            continue
+        station_index.update(row.get("station_id") or row.get("city", ""), lat, lon, row)
+    STATIONS_INDEXED.set(len(station_index))
+
+
+def record_alerts(rows):
+    """Append alerts for newly ingested rows to the alert buffer."""
+    alert_buffer.ingest(rows, len(sensor_store.records) - len(rows))
+    ALERTS_LAST_ID.set(alert_buffer.last_id)
+
+
+def track_latest(rows):
+    """Keep each city's latest reading so dashboards need not scan history."""
+    for row in rows:
+        latest_by_city[row.get("city", "")] = row
+
+
+sensor_store.subscribe(track_latest, on_reset=latest_by_city.clear)
+sensor_store.subscribe(index_stations, on_reset=station_index.clear)
+sensor_store.subscribe(record_alerts, on_reset=alert_buffer.reset_rows)
+sensor_store.subscribe(trend_series.append, on_reset=trend_series.clear)
+
+
 def read_csv_data():
     """Read the raw sensor CSV for trend data."""
-    import csv
-    filepath = os.path.join(DATA_DIR, "sensor_data.csv")
-    records = []
-    if os.path.exists(filepath):
+    with stage("csv_ingest"):
+        return sensor_store.refresh()
+
+
+# Serialized dashboard responses, keyed by request and data version
+response_cache = ResponseCache()
+
+
+def sensor_data_version():
+    """Version of the sensor data; advances only when new rows are ingested."""
+    read_csv_data()
+    return sensor_store.version
+
+
+def stats_data_version():
+    """Version of /api/stats inputs: pipeline stats file plus sensor data."""
+    return file_signature(os.path.join(OUTPUT_DIR, "city_stats.jsonl")), sensor_data_version()
+
+
+def format_station(data, distance_km=None):
+    """Format a raw sensor row as a station reading."""
+    station = {
+        "station_id": data.get("station_id") or data.get("city", ""),
+        "city": data.get("city", ""),
+        "latitude": float(data.get("latitude", 0)),
+        "longitude": float(data.get("longitude", 0)),
+        "aqi": int(float(data.get("aqi", 0))),
+        "aqi_category": data.get("aqi_category", "Unknown"),
+        "pm25": float(data.get("pm25", 0)),
+        "pm10": float(data.get("pm10", 0)),
+        "timestamp": data.get("timestamp", ""),
+    }
+    if distance_km is not None:
+        station["distance_km"] = round(distance_km, 2)
+    return station
+
+
+def parse_float_args(*names):
+    """Parse required float query parameters, raising ValueError with a message."""
+    values = []
+    for name in names:
+        raw = request.args.get(name)
+        if raw is None:
+            raise ValueError(f"Missing parameter: {name}")
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    records.append(row)
-        except Exception as e:
-            print(f"[API] Error reading CSV: {e}")
-    return records
+            value = float(raw)
+        except ValueError:
+            raise ValueError(f"Invalid number for {name}: {raw}")
+        if not math.isfinite(value):
+            raise ValueError(f"Invalid number for {name}: {raw}")
+        values.append(value)
+    return values
+
+
+def check_coordinates(*points):
+    """Raise ValueError unless each (lat, lon) pair is a valid coordinate."""
+    for lat, lon in points:
+        if not -90 <= lat <= 90:
+            raise ValueError(f"Latitude must be between -90 and 90: {lat}")
+        if not -180 <= lon <= 180:
+            raise ValueError(f"Longitude must be between -180 and 180: {lon}")
+
+
+def check_bbox(min_lat, min_lon, max_lat, max_lon):
+    """Validate a bounding box; min_lon > max_lon means it crosses the antimeridian."""
+    check_coordinates((min_lat, min_lon), (max_lat, max_lon))
+    if min_lat > max_lat:
+        raise ValueError(f"min_lat must not exceed max_lat: {min_lat} > {max_lat}")
+
+
+def check_positive(name, value):
+    if not value > 0:
+        raise ValueError(f"{name} must be greater than 0: {value}")
 
 
 # --- API Endpoints ---
 
 @app.route("/api/aqi", methods=["GET"])
+@response_cache.cached(sensor_data_version)
 def get_aqi():
     """Get latest AQI readings per city."""
     records = read_csv_data()
     if not records:
         return jsonify({"cities": [], "last_update": None})
 
-    # Get latest reading per city
-    city_latest = {}
-    for record in records:
-        city = record.get("city", "")
-        city_latest[city] = record
+    # Latest reading per city, maintained at ingest
+    city_latest = dict(latest_by_city)
 
     cities = []
     for city, data in city_latest.items():
@@ -114,32 +274,46 @@ def get_aqi():
 
 @app.route("/api/alerts", methods=["GET"])
 def get_alerts():
-    """Get anomaly alerts."""
-    records = read_csv_data()
-    alerts = []
-    for record in records:
-        aqi = int(float(record.get("aqi", 0)))
-        pm25 = float(record.get("pm25", 0))
-        if aqi > 200 or pm25 > 60:
-            alert_type = "CRITICAL" if aqi > 300 else "WARNING" if aqi > 200 else "CAUTION"
-            alerts.append({
-                "timestamp": record.get("timestamp", ""),
-                "city": record.get("city", ""),
-                "aqi": aqi,
-                "pm25": pm25,
-                "aqi_category": record.get("aqi_category", ""),
-                "alert_type": alert_type,
-            })
-
-    # Return last 50 alerts, most recent first
-    alerts.reverse()
-    return jsonify({"alerts": alerts[:50], "total": len(alerts)})
+    """Get anomaly alerts, newest first, with an optional `since` cursor."""
+    try:
+        since = request.args.get("since", None)
+        since = int(since) if since else None
+        limit = min(int(request.args.get("limit", 50)), MAX_ALERTS_PAGE)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    city = request.args.get("city", None)
+    alert_type = request.args.get("alert_type", None)
+
+    read_csv_data()
+    alerts, total, has_more, gap = alert_buffer.page(since, city, alert_type, limit)
+    alerts = [{k: v for k, v in alert.items() if k not in ("row", "source")} for alert in alerts]
+
+    if alerts:
+        next_cursor = alerts[0]["id"]
+    else:
+        next_cursor = since if since is not None else alert_buffer.last_id
+    return jsonify({
+        "alerts": alerts,
+        "total": total,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+        # Alerts after `since` were evicted from memory and are not in this page
+        "gap": gap,
+    })
 
 
 @app.route("/api/trends", methods=["GET"])
+@response_cache.cached(sensor_data_version)
 def get_trends():
-    """Get historical trend data for charts."""
+    """Get historical trend data for charts.
+
+    With `points=N`, each city's series are decimated with LTTB to at most N
+    points (over the last `limit` readings per city, or the full history).
+    """
     city = request.args.get("city", None)
+    if request.args.get("points"):
+        return get_decimated_trends(city)
+
     limit = int(request.args.get("limit", 100))
 
     records = read_csv_data()
@@ -165,7 +339,37 @@ def get_trends():
     return jsonify({"trends": trends})
 
 
+def get_decimated_trends(city):
+    """Per-city, per-series LTTB-decimated trends."""
+    try:
+        points = int(request.args.get("points"))
+        limit = request.args.get("limit", None)
+        limit = int(limit) if limit else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not 3 <= points <= MAX_TREND_POINTS:
+        return jsonify({"error": f"points must be between 3 and {MAX_TREND_POINTS}"}), 400
+    if limit is not None and limit < 1:
+        return jsonify({"error": "limit must be at least 1"}), 400
+
+    fields = request.args.get("fields", None)
+    fields = [f for f in fields.split(",") if f] if fields else list(TREND_FIELDS)
+    unknown = [f for f in fields if f not in TREND_FIELDS]
+    if unknown:
+        return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
+
+    read_csv_data()
+    cities = [city] if city else trend_series.cities()
+    series = {}
+    for name in cities:
+        decimated = trend_series.decimate(name, points, fields, limit)
+        if decimated:
+            series[name] = decimated
+    return jsonify({"series": series, "points": points})
+
+
 @app.route("/api/stats", methods=["GET"])
+@response_cache.cached(stats_data_version)
 def get_stats():
     """Get city-wise aggregated stats."""
     records = read_jsonl("city_stats.jsonl")
@@ -198,6 +402,81 @@ def get_stats():
     return jsonify({"stats": records})
 
 
+@app.route("/api/stations/nearby", methods=["GET"])
+def get_stations_nearby():
+    """Get latest readings of stations within a radius of a point."""
+    try:
+        lat, lon, radius_km = parse_float_args("lat", "lon", "radius_km")
+        check_coordinates((lat, lon))
+        check_positive("radius_km", radius_km)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    read_csv_data()
+    stations = [
+        format_station(data, distance)
+        for distance, data in station_index.within_radius(lat, lon, radius_km)
+    ]
+    return jsonify({"stations": stations})
+
+
+@app.route("/api/stations/bbox", methods=["GET"])
+def get_stations_bbox():
+    """Get latest readings of stations inside a bounding box."""
+    try:
+        min_lat, min_lon, max_lat, max_lon = parse_float_args("min_lat", "min_lon", "max_lat", "max_lon")
+        check_bbox(min_lat, min_lon, max_lat, max_lon)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    read_csv_data()
+    stations = [format_station(data) for data in station_index.in_bbox(min_lat, min_lon, max_lat, max_lon)]
+    stations.sort(key=lambda x: -x["aqi"])
+    return jsonify({"stations": stations})
+
+
+@app.route("/api/stations/nearest", methods=["GET"])
+def get_stations_nearest():
+    """Get the N stations nearest to a point."""
+    try:
+        lat, lon = parse_float_args("lat", "lon")
+        check_coordinates((lat, lon))
+        n = int(request.args.get("n", 5))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    read_csv_data()
+    stations = [format_station(data, distance) for distance, data in station_index.nearest(lat, lon, n)]
+    return jsonify({"stations": stations})
+
+
+@app.route("/api/aqi/grid", methods=["GET"])
+def get_aqi_grid():
+    """Get IDW-interpolated AQI on a regular grid for map tiles."""
+    try:
+        min_lat, min_lon, max_lat, max_lon = parse_float_args("min_lat", "min_lon", "max_lat", "max_lon")
+        check_bbox(min_lat, min_lon, max_lat, max_lon)
+        rows = int(request.args.get("rows", 32))
+        cols = int(request.args.get("cols", 32))
+        power = float(request.args.get("power", 2))
+        if not math.isfinite(power):
+            raise ValueError(f"Invalid number for power: {power}")
+        check_positive("power", power)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not (1 <= rows <= MAX_GRID_SIZE and 1 <= cols <= MAX_GRID_SIZE):
+        return jsonify({"error": f"rows and cols must be between 1 and {MAX_GRID_SIZE}"}), 400
+
+    read_csv_data()
+    grid = station_index.idw_grid(min_lat, min_lon, max_lat, max_lon, rows, cols, power=power)
+    return jsonify({
+        "bbox": [min_lat, min_lon, max_lat, max_lon],
+        "rows": rows,
+        "cols": cols,
+        "aqi": grid,
+    })
+
+
 @app.route("/api/ask", methods=["POST"])
 def ask_rag():
     """Query the RAG knowledge base."""
@@ -207,49 +486,41 @@ def ask_rag():
     if not query:
         return jsonify({"error": "No query provided"}), 400
 
-    try:
-        # Try Pathway RAG server first
-        resp = requests.post(
-            f"{RAG_URL}/v1/answer",
-            json={"query": query},
-            timeout=10,
-        )
-        if resp.status_code == 200:
-            return jsonify(resp.json())
-    except requests.exceptions.ConnectionError:
-        pass
-    except Exception as e:
-        print(f"[API] RAG query error: {e}")
-
-    # Fallback: try root endpoint
-    try:
-        resp = requests.post(
-            RAG_URL,
-            json={"query": query},
-            timeout=10,
-        )
-        if resp.status_code == 200:
-            return jsonify(resp.json())
-    except:
-        pass
+    result = rag_client.answer(query)
+    if result is not None:
+        ASK_ANSWERS.inc(source="rag")
+        return jsonify(result)
+
+    # RAG server unavailable — answer from the local keyword retriever
+    global _local_knowledge
+    if not _local_knowledge:
+        # Retry while empty, so documents added later are picked up
+        _local_knowledge = load_knowledge_base(KNOWLEDGE_DIR)
+    if not _local_knowledge:
+        ASK_ANSWERS.inc(source="unavailable")
+        return jsonify({
+            "answer": "The RAG server is not currently available. Please start it with: python rag_server.py",
+            "sources": []
+        })
 
-    return jsonify({
-        "answer": "The RAG server is not currently available. Please start it with: python rag_server.py",
-        "sources": []
-    })
+    with LOCAL_RETRIEVAL_SECONDS.time(), stage("rag_search"):
+        results = search_knowledge(_local_knowledge, query)
+    response = generate_answer(query, results)
+    response["mode"] = "local"
+    ASK_ANSWERS.inc(source="local")
+    return jsonify(response)
 
 
 @app.route("/api/summary", methods=["GET"])
+@response_cache.cached(sensor_data_version)
 def get_summary():
     """Get a real-time summary of environmental status."""
     records = read_csv_data()
     if not records:
         return jsonify({"summary": "No data available yet. Start the data simulator."})
 
-    # Get latest per city
-    city_latest = {}
-    for r in records:
-        city_latest[r.get("city", "")] = r
+    # Latest reading per city, maintained at ingest
+    city_latest = dict(latest_by_city)
 
     total_cities = len(city_latest)
     aqis = [int(float(r.get("aqi", 0))) for r in city_latest.values()]
@@ -271,6 +542,13 @@ def get_summary():
     return jsonify(summary)
 
 
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Prometheus-style metrics for the API server."""
+    RAG_BREAKER_OPEN.set(0 if rag_client.breaker.state == "closed" else 1)
+    return metrics_response()
+
+
 # --- Frontend Serving ---
 
 @app.route("/")
@@ -284,6 +562,8 @@ def serve_static(path):
 
 
 if __name__ == "__main__":
+    enable_from_env("api_server")
+    install_flask_profiling(app)
     print("=" * 60)
     print("  🌐 GreenBharat AI — API Server")
     print("=" * 60)
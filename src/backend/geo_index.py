@@ -0,0 +1,205 @@
+"""
+GreenBharat AI — Geospatial Station Index
+Uniform lat/lon grid over monitoring stations, updated at ingest with each
+station's latest reading. Radius, bounding-box and nearest-N queries only
+visit the grid cells that can contain matches, so their cost depends on the
+size of the query area rather than the total number of stations.
+"""
+
+import heapq
+import math
+import threading
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEG_LAT = 111.32
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM  # half the circumference: covers the globe
+DEFAULT_CELL_DEG = 0.5
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class StationIndex:
+    """Latest reading per station, bucketed into a lat/lon grid.
+
+    Columns wrap around at the antimeridian and searches whose area reaches
+    a pole cover every column, so results match a brute-force haversine
+    scan anywhere on the globe.
+    """
+
+    def __init__(self, cell_deg=DEFAULT_CELL_DEG):
+        n_cols = round(360.0 / cell_deg)
+        if abs(n_cols * cell_deg - 360.0) > 1e-9:
+            raise ValueError(f"cell_deg must divide 360: {cell_deg}")
+        self.cell_deg = cell_deg
+        self.n_cols = n_cols
+        self.n_rows = math.ceil(180.0 / cell_deg)
+        self._stations = {}  # station_id -> (lat, lon, reading)
+        self._cells = {}  # (row, col) -> set of station_ids
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._stations)
+
+    def _row(self, lat):
+        return min(max(math.floor((lat + 90.0) / self.cell_deg), 0), self.n_rows - 1)
+
+    def _col(self, lon):
+        return math.floor((lon + 180.0) / self.cell_deg) % self.n_cols
+
+    def _cell(self, lat, lon):
+        if not (math.isfinite(lat) and math.isfinite(lon)):
+            raise ValueError(f"Coordinates must be finite: {lat}, {lon}")
+        return self._row(lat), self._col(lon)
+
+    def _col_span(self, west, east):
+        """Columns covering longitudes west..east (east may exceed 180), or None for all."""
+        first = math.floor((west + 180.0) / self.cell_deg)
+        last = math.floor((east + 180.0) / self.cell_deg)
+        if last - first + 1 >= self.n_cols:
+            return None
+        return {col % self.n_cols for col in range(first, last + 1)}
+
+    def update(self, station_id, lat, lon, reading):
+        """Insert or move a station and store its latest reading."""
+        with self._lock:
+            previous = self._stations.get(station_id)
+            cell = self._cell(lat, lon)
+            if previous is not None:
+                old_cell = self._cell(previous[0], previous[1])
+                if old_cell != cell:
+                    self._cells[old_cell].discard(station_id)
+                    if not self._cells[old_cell]:
+                        del self._cells[old_cell]
+            self._cells.setdefault(cell, set()).add(station_id)
+            self._stations[station_id] = (lat, lon, reading)
+
+    def clear(self):
+        with self._lock:
+            self._stations.clear()
+            self._cells.clear()
+
+    def _stations_in_cells(self, row_min, row_max, cols):
+        """Yield (station_id, lat, lon, reading) for stations in a row range and column set.
+
+        cols is a set of column indices, or None for every column.
+        """
+        n_cols = self.n_cols if cols is None else len(cols)
+        # Walk whichever is smaller: the cell range or the occupied cells
+        if (row_max - row_min + 1) * n_cols <= len(self._cells):
+            cells = (
+                (r, c) for r in range(row_min, row_max + 1)
+                for c in (range(self.n_cols) if cols is None else cols)
+            )
+        else:
+            cells = (
+                cell for cell in self._cells
+                if row_min <= cell[0] <= row_max and (cols is None or cell[1] in cols)
+            )
+        for cell in cells:
+            for station_id in self._cells.get(cell, ()):
+                lat, lon, reading = self._stations[station_id]
+                yield station_id, lat, lon, reading
+
+    def in_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        """Return latest readings of stations inside a bounding box.
+
+        A box with min_lon > max_lon crosses the antimeridian.
+        """
+        if min_lat > max_lat:
+            raise ValueError(f"min_lat must not exceed max_lat: {min_lat} > {max_lat}")
+        crosses = min_lon > max_lon
+        cols = self._col_span(min_lon, max_lon + 360.0 if crosses else max_lon)
+        with self._lock:
+            return [
+                reading
+                for _, lat, lon, reading in self._stations_in_cells(self._row(min_lat), self._row(max_lat), cols)
+                if min_lat <= lat <= max_lat
+                and ((lon >= min_lon or lon <= max_lon) if crosses else min_lon <= lon <= max_lon)
+            ]
+
+    def _scan_radius(self, lat, lon, radius_km):
+        """Unsorted (distance_km, reading) for stations within radius_km."""
+        self._cell(lat, lon)  # validates the coordinates
+        angle = radius_km / EARTH_RADIUS_KM  # radians of arc
+        dlat = math.degrees(angle)
+        cols = None
+        if lat - dlat > -90.0 and lat + dlat < 90.0:
+            # Widest longitude offset of a spherical cap that does not reach a pole
+            ratio = math.sin(min(angle, math.pi / 2)) / math.cos(math.radians(lat))
+            if ratio < 1.0:
+                dlon = math.degrees(math.asin(ratio))
+                cols = self._col_span(lon - dlon, lon + dlon)
+        results = []
+        with self._lock:
+            for _, s_lat, s_lon, reading in self._stations_in_cells(self._row(lat - dlat), self._row(lat + dlat), cols):
+                distance = haversine_km(lat, lon, s_lat, s_lon)
+                if distance <= radius_km:
+                    results.append((distance, reading))
+        return results
+
+    def within_radius(self, lat, lon, radius_km):
+        """Return (distance_km, reading) for stations within radius_km, nearest first."""
+        results = self._scan_radius(lat, lon, radius_km)
+        results.sort(key=lambda x: x[0])
+        return results
+
+    def nearest(self, lat, lon, n):
+        """Return (distance_km, reading) for the n stations closest to a point.
+
+        Runs radius searches of doubling size, starting from one cell, until
+        one holds at least n stations; those include the n nearest.
+        """
+        if n <= 0 or not self._stations:
+            return []
+        radius = self.cell_deg * KM_PER_DEG_LAT
+        while True:
+            found = self._scan_radius(lat, lon, radius)
+            if len(found) >= n or radius >= MAX_DISTANCE_KM:
+                return heapq.nsmallest(n, found, key=lambda x: x[0])
+            radius *= 2
+
+    def idw_grid(self, min_lat, min_lon, max_lat, max_lon, rows, cols,
+                 field="aqi", power=2.0, neighbours=4):
+        """Interpolate a reading field on a rows x cols grid by inverse distance weighting.
+
+        Each grid point uses its `neighbours` nearest stations. Returns a list
+        of rows (south to north), each a list of values (west to east), or
+        None where no station is available. A box with min_lon > max_lon
+        crosses the antimeridian.
+        """
+        if min_lat > max_lat:
+            raise ValueError(f"min_lat must not exceed max_lat: {min_lat} > {max_lat}")
+        lon_span = max_lon - min_lon if min_lon <= max_lon else max_lon + 360.0 - min_lon
+        lat_step = (max_lat - min_lat) / (rows - 1) if rows > 1 else 0.0
+        lon_step = lon_span / (cols - 1) if cols > 1 else 0.0
+        grid = []
+        for i in range(rows):
+            lat = min_lat + i * lat_step
+            row_values = []
+            for j in range(cols):
+                lon = min_lon + j * lon_step
+                weight_sum = value_sum = 0.0
+                value = None
+                for distance, reading in self.nearest(lat, lon, neighbours):
+                    try:
+                        field_value = float(reading.get(field, 0))
+                    except (TypeError, ValueError):
+                        continue
+                    if distance < 1e-6:
+                        value = field_value
+                        break
+                    weight = 1.0 / distance ** power
+                    weight_sum += weight
+                    value_sum += weight * field_value
+                if value is None and weight_sum > 0:
+                    value = value_sum / weight_sum
+                row_values.append(round(value, 1) if value is not None else None)
+            grid.append(row_values)
+        return grid
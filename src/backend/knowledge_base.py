@@ -0,0 +1,183 @@
+"""
+GreenBharat AI — Keyword Knowledge Base
+In-process keyword retriever over the markdown knowledge base.
+Shared by the fallback RAG server and the API server's local fallback.
+
+Documents are chunked once at load time: every chunk stays under a token
+budget, never crosses a heading, and carries its heading path, byte offsets
+in the source file and a precomputed answer snippet, so answering a query
+does no string splitting.
+"""
+
+import os
+import re
+
+CHUNK_MAX_TOKENS = 160  # whitespace-delimited tokens per chunk
+PREVIEW_CHARS = 500
+SNIPPET_MAX_LINES = 4
+SNIPPET_MIN_LINE_CHARS = 20
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_FENCE_RE = re.compile(r"^(`{3,}|~{3,})")
+_WORD_RE = re.compile(r"\S+")
+
+
+def _count_tokens(text):
+    return len(text.split())
+
+
+def _split_after_words(line, n):
+    """Split a line after its first n words; the two parts concatenate to line."""
+    for i, match in enumerate(_WORD_RE.finditer(line)):
+        if i == n:
+            return line[:match.start()], line[match.start():]
+    return line, ""
+
+
+def _snippet_lines(lines):
+    """Pick the first few informative lines of a chunk for answers."""
+    snippet = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#") and len(line) > SNIPPET_MIN_LINE_CHARS:
+            snippet.append(line)
+        if len(snippet) >= SNIPPET_MAX_LINES:
+            break
+    return snippet
+
+
+def _make_chunk(source, heading_path, lines, start_byte, end_byte):
+    content = "".join(lines).strip()
+    heading_text = " > ".join(heading_path)
+    return {
+        "source": source,
+        "heading_path": list(heading_path),
+        "start_byte": start_byte,
+        "end_byte": end_byte,
+        "tokens": _count_tokens(content),
+        "content": content,
+        "preview": content[:PREVIEW_CHARS],
+        "snippet": _snippet_lines(lines),
+        # Headings are searchable even though they are not repeated in every chunk
+        "search_text": f"{heading_text}\n{content}".lower(),
+        "title_text": heading_path[-1].lower() if heading_path else "",
+    }
+
+
+def chunk_markdown(text, source, max_tokens=CHUNK_MAX_TOKENS):
+    """Split a markdown document into heading-aligned, token-bounded chunks.
+
+    A new chunk starts at every heading and whenever adding the next line
+    would push the chunk past max_tokens; a single line longer than the
+    budget is split on word boundaries. Lines inside fenced code blocks are
+    never taken as headings. Chunks with no body text (a heading immediately
+    followed by a sub-heading) are dropped; their titles survive in the
+    heading path of the chunks below them.
+    """
+    chunks = []
+    heading_path = []
+    lines = []
+    tokens = 0
+    has_body = False
+    start_byte = offset = 0
+    fence = None  # opening marker of the code block we are in, if any
+
+    def flush():
+        if lines and has_body:
+            chunks.append(_make_chunk(source, heading_path, lines, start_byte, offset))
+
+    for line in text.splitlines(keepends=True):
+        stripped = line.strip()
+        heading = _HEADING_RE.match(stripped) if fence is None else None
+        marker = _FENCE_RE.match(stripped)
+        if fence is None and marker:
+            fence = marker.group(1)
+        elif fence and marker and stripped == marker.group(1) and marker.group(1)[0] == fence[0] \
+                and len(marker.group(1)) >= len(fence):
+            fence = None
+
+        if heading:
+            flush()
+            level = len(heading.group(1))
+            heading_path = heading_path[:level - 1] + [heading.group(2)]
+            lines, tokens, has_body, start_byte = [line], _count_tokens(line), False, offset
+            offset += len(line.encode("utf-8"))
+            continue
+
+        while line:
+            line_tokens = _count_tokens(line)
+            if has_body and tokens + line_tokens > max_tokens:
+                flush()
+                lines, tokens, has_body = [], 0, False
+                continue
+            piece, line = line, ""
+            if tokens + line_tokens > max_tokens:
+                # Longer than the whole budget on its own: take what fits
+                piece, line = _split_after_words(piece, max(max_tokens - tokens, 1))
+            if not lines:
+                start_byte = offset
+            lines.append(piece)
+            tokens += _count_tokens(piece)
+            has_body = has_body or bool(piece.strip())
+            offset += len(piece.encode("utf-8"))
+
+    flush()
+    return chunks
+
+
+def load_knowledge_base(knowledge_dir, max_tokens=CHUNK_MAX_TOKENS):
+    """Load markdown files from a directory and chunk them for search."""
+    knowledge_base = []
+    if not os.path.isdir(knowledge_dir):
+        return knowledge_base
+
+    for filename in sorted(os.listdir(knowledge_dir)):
+        if filename.endswith(".md"):
+            filepath = os.path.join(knowledge_dir, filename)
+            with open(filepath, "r", encoding="utf-8", newline="") as f:
+                content = f.read()
+            knowledge_base.extend(chunk_markdown(content, filename, max_tokens))
+    return knowledge_base
+
+
+def search_knowledge(knowledge_base, query):
+    """Simple keyword-based search with relevance scoring."""
+    query_lower = query.lower()
+    query_words = set(query_lower.split())
+    scored = []
+    for entry in knowledge_base:
+        search_text = entry["search_text"]
+        score = sum(1 for w in query_words if w in search_text)
+        # Boost for exact phrase matches
+        if query_lower in search_text:
+            score += 5
+        if score > 0:
+            # Break ties towards chunks whose own heading names the topic
+            score += sum(1 for w in query_words if w in entry["title_text"])
+            scored.append((score, entry))
+    scored.sort(key=lambda x: -x[0])
+    return scored[:3]
+
+
+def generate_answer(query, context_entries):
+    """Generate a helpful answer from context."""
+    if not context_entries:
+        return {
+            "answer": "I don't have specific information about that in my knowledge base. Try asking about air quality standards, sustainability tips, or India's climate initiatives.",
+            "sources": []
+        }
+
+    sources = []
+    for score, entry in context_entries:
+        if entry["source"] not in sources:
+            sources.append(entry["source"])
+
+    # Generate a summary-style answer from the precomputed snippets
+    answer_lines = [f"Based on the GreenBharat knowledge base:\n"]
+    for score, entry in context_entries[:2]:
+        answer_lines.extend(entry["snippet"])
+
+    return {
+        "answer": "\n".join(answer_lines),
+        "sources": sources
+    }
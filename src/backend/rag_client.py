@@ -0,0 +1,157 @@
+"""
+GreenBharat AI — RAG Client
+Pooled, keep-alive HTTP client used by the API server to reach the RAG server.
+Short timeouts, a circuit breaker and in-flight request coalescing keep a slow
+or dead RAG server from tying up API workers.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.metrics import REGISTRY
+
+RAG_CONNECT_TIMEOUT = 0.5  # seconds
+RAG_READ_TIMEOUT = 5  # seconds
+RAG_POOL_SIZE = 16
+
+BREAKER_FAILURE_THRESHOLD = 3  # consecutive failures before opening
+BREAKER_RESET_SECONDS = 15  # how long to skip the server once open
+
+RAG_REQUEST_SECONDS = REGISTRY.histogram(
+    "api_rag_request_duration_seconds", "Time spent waiting on the RAG server.", ["outcome"])
+RAG_REQUESTS = REGISTRY.counter(
+    "api_rag_requests_total", "RAG lookups by how they were served.", ["result"])
+
+
+class CircuitBreaker:
+    """Skip calls to a server that has recently failed repeatedly.
+
+    closed    -> calls go through; failures are counted
+    open      -> calls are skipped until the reset period has passed
+    half-open -> a single trial call is let through; success closes the breaker
+    """
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half-open"
+            return "open"
+
+    def allow(self):
+        """Return True if a call may be attempted now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_seconds:
+                return False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class RagClient:
+    """Query the RAG server over a shared connection pool."""
+
+    def __init__(self, base_url, connect_timeout=RAG_CONNECT_TIMEOUT,
+                 read_timeout=RAG_READ_TIMEOUT, pool_size=RAG_POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        # Pathway DocumentStoreServer serves /v1/answer; older servers answer at the root
+        self.urls = (f"{self.base_url}/v1/answer", self.base_url)
+        self.timeout = (connect_timeout, read_timeout)
+        # A leader may try every URL, each up to the connect + read timeout
+        self.follower_timeout = len(self.urls) * sum(self.timeout) + 1.0
+        self.breaker = CircuitBreaker()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+
+    def answer(self, query):
+        """Return the RAG server's answer dict, or None if it is unavailable.
+
+        Identical queries that arrive while one is already in flight wait for
+        that request instead of issuing their own.
+        """
+        with self._in_flight_lock:
+            future = self._in_flight.get(query)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[query] = future
+
+        if not leader:
+            RAG_REQUESTS.inc(result="coalesced")
+            try:
+                return future.result(timeout=self.follower_timeout)
+            except Exception:
+                return None
+
+        result = None
+        try:
+            if self.breaker.allow():
+                start = time.perf_counter()
+                result = self._post_answer(query)
+                outcome = "success" if result is not None else "failure"
+                RAG_REQUEST_SECONDS.observe(time.perf_counter() - start, outcome=outcome)
+                RAG_REQUESTS.inc(result=outcome)
+            else:
+                RAG_REQUESTS.inc(result="breaker_open")
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.pop(query, None)
+            future.set_result(result)
+        return result
+
+    def _post_answer(self, query):
+        for url in self.urls:
+            try:
+                resp = self.session.post(url, json={"query": query}, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                # Server is down or hanging — the root endpoint won't do better
+                self.breaker.record_failure()
+                return None
+            except Exception as e:
+                print(f"[API] RAG query error: {e}")
+                continue
+            if resp.status_code == 200:
+                try:
+                    data = resp.json()
+                except ValueError:
+                    continue
+                self.breaker.record_success()
+                return data
+        self.breaker.record_failure()
+        return None
@@ -7,6 +7,8 @@ Knowledge documents auto-update when files change.
 import os
 import sys
 
+from src.profiling import stage, enable_from_env, install_flask_profiling
+
 # Check if OpenAI key is available
 USE_LLM = bool(os.environ.get("OPENAI_API_KEY"))
 
@@ -27,7 +29,8 @@ else:
     print("[RAG] No OPENAI_API_KEY found. Running in fallback mode.")
 
 
-KNOWLEDGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "knowledge")
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+KNOWLEDGE_DIR = os.path.join(ROOT_DIR, "knowledge")
 RAG_PORT = 8011
 
 
@@ -85,87 +88,49 @@ def run_rag_server_fallback():
     """Fallback RAG server using Flask with keyword matching."""
     from flask import Flask, request, jsonify
     from flask_cors import CORS
+    from src.backend.knowledge_base import (
+        load_knowledge_base, search_knowledge, generate_answer,
+    )
+    from src.metrics import REGISTRY, metrics_response
+
+    retrieval_seconds = REGISTRY.histogram(
+        "rag_retrieval_duration_seconds", "Knowledge base search latency.", ["endpoint"])
+    answer_seconds = REGISTRY.histogram(
+        "rag_answer_duration_seconds", "Search plus answer generation latency.", ["endpoint"])
+    queries_total = REGISTRY.counter(
+        "rag_queries_total", "Queries by endpoint and whether anything matched.", ["endpoint", "matched"])
 
     app = Flask(__name__)
     CORS(app)
+    install_flask_profiling(app)
 
     # Load knowledge base into memory
-    knowledge_base = []
-    for filename in os.listdir(KNOWLEDGE_DIR):
-        if filename.endswith(".md"):
-            filepath = os.path.join(KNOWLEDGE_DIR, filename)
-            with open(filepath, "r", encoding="utf-8") as f:
-                content = f.read()
-                # Split into sections
-                sections = content.split("\n## ")
-                for section in sections:
-                    knowledge_base.append({
-                        "source": filename,
-                        "content": section.strip()
-                    })
-
-    def search_knowledge(query):
-        """Simple keyword-based search with relevance scoring."""
-        query_words = set(query.lower().split())
-        scored = []
-        for entry in knowledge_base:
-            content_lower = entry["content"].lower()
-            score = sum(1 for w in query_words if w in content_lower)
-            # Boost for exact phrase matches
-            if query.lower() in content_lower:
-                score += 5
-            if score > 0:
-                scored.append((score, entry))
-        scored.sort(key=lambda x: -x[0])
-        return scored[:3]
-
-    def generate_answer(query, context_entries):
-        """Generate a helpful answer from context."""
-        if not context_entries:
-            return {
-                "answer": "I don't have specific information about that in my knowledge base. Try asking about air quality standards, sustainability tips, or India's climate initiatives.",
-                "sources": []
-            }
-
-        # Build context
-        context_parts = []
-        sources = []
-        for score, entry in context_entries:
-            context_parts.append(entry["content"][:500])
-            if entry["source"] not in sources:
-                sources.append(entry["source"])
-
-        context = "\n\n".join(context_parts)
-
-        # Generate a summary-style answer
-        answer_lines = [f"Based on the GreenBharat knowledge base:\n"]
-
-        # Extract key points from context
-        for part in context_parts[:2]:
-            lines = part.split("\n")
-            relevant_lines = []
-            for line in lines:
-                line = line.strip()
-                if line and not line.startswith("#") and len(line) > 20:
-                    relevant_lines.append(line)
-                if len(relevant_lines) >= 4:
-                    break
-            if relevant_lines:
-                answer_lines.extend(relevant_lines)
-
-        return {
-            "answer": "\n".join(answer_lines),
-            "sources": sources
-        }
+    knowledge_base = load_knowledge_base(KNOWLEDGE_DIR)
+    REGISTRY.gauge("rag_documents", "Chunks in the knowledge base.").set(len(knowledge_base))
+
+    def timed_search(endpoint, query):
+        with retrieval_seconds.time(endpoint=endpoint), stage("rag_search"):
+            results = search_knowledge(knowledge_base, query)
+        queries_total.inc(endpoint=endpoint, matched=str(bool(results)).lower())
+        return results
+
+    def timed_answer(endpoint, query):
+        with answer_seconds.time(endpoint=endpoint):
+            return generate_answer(query, timed_search(endpoint, query))
 
     @app.route("/v1/retrieve", methods=["POST"])
     def retrieve():
         data = request.json
         query = data.get("query", "")
-        results = search_knowledge(query)
+        results = timed_search("retrieve", query)
         return jsonify({
             "results": [
-                {"content": entry["content"][:500], "source": entry["source"], "score": score}
+                {
+                    "content": entry["preview"],
+                    "source": entry["source"],
+                    "heading_path": entry["heading_path"],
+                    "score": score,
+                }
                 for score, entry in results
             ]
         })
@@ -174,8 +139,7 @@ def run_rag_server_fallback():
     def answer():
         data = request.json
         query = data.get("query", "")
-        results = search_knowledge(query)
-        response = generate_answer(query, results)
+        response = timed_answer("answer", query)
         return jsonify(response)
 
     @app.route("/", methods=["POST"])
@@ -183,10 +147,13 @@ def run_rag_server_fallback():
         """Handle queries at root path."""
         data = request.json
         query = data.get("query", data.get("messages", ""))
-        results = search_knowledge(query)
-        response = generate_answer(query, results)
+        response = timed_answer("root", query)
         return jsonify(response)
 
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        return metrics_response()
+
     @app.route("/health", methods=["GET"])
     def health():
         return jsonify({"status": "healthy", "mode": "fallback", "documents": len(knowledge_base)})
@@ -195,13 +162,14 @@ def run_rag_server_fallback():
     print("  🧠 GreenBharat AI — RAG Server (Fallback Mode)")
     print("=" * 60)
     print(f"  Knowledge base: {KNOWLEDGE_DIR}")
-    print(f"  Documents loaded: {len(knowledge_base)} sections")
+    print(f"  Documents loaded: {len(knowledge_base)} chunks")
     print(f"  Port: {RAG_PORT}")
     print("=" * 60)
     app.run(host="0.0.0.0", port=RAG_PORT, debug=False)
 
 
 if __name__ == "__main__":
+    enable_from_env("rag_server")
     if PATHWAY_LLM_AVAILABLE and USE_LLM:
         run_rag_server_pathway()
     else:
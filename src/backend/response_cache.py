@@ -0,0 +1,144 @@
+"""
+GreenBharat AI — Response Cache
+Caches serialized JSON responses per (path, query params, data version).
+Bodies are stored pre-serialized and pre-gzipped and shared across clients;
+each entry carries an ETag so unchanged polls are answered with 304 and no
+body at all.
+"""
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request, Response
+
+from src.metrics import REGISTRY
+
+DEFAULT_MAX_ENTRIES = 256
+GZIP_MIN_BYTES = 512  # smaller bodies are not worth compressing
+GZIP_LEVEL = 6
+
+RESPONSE_CACHE_REQUESTS = REGISTRY.counter(
+    "api_response_cache_requests_total", "Response cache lookups by result.", ["result"])
+
+
+class _Entry:
+    __slots__ = ("body", "gzipped", "etag", "gzip_etag", "mimetype")
+
+    def __init__(self, body, mimetype):
+        self.body = body
+        self.mimetype = mimetype
+        digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+        # Each content-coding is a separate representation with its own strong tag
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+        self.gzipped = gzip.compress(body, GZIP_LEVEL, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+
+
+def _accepts_gzip(header):
+    """Whether an Accept-Encoding header allows gzip, honouring q-values."""
+    gzip_q = None
+    wildcard_q = None
+    for item in (header or "").split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding in ("gzip", "x-gzip"):
+            gzip_q = q
+        elif coding == "*":
+            wildcard_q = q
+    if gzip_q is None:
+        gzip_q = wildcard_q
+    return gzip_q is not None and gzip_q > 0
+
+
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison: ignore W/ prefixes (gzip proxies may weaken our tags)
+    candidates = (tag.strip().removeprefix("W/") for tag in header.split(","))
+    return etag in candidates
+
+
+class ResponseCache:
+    """LRU of serialized responses keyed by request and data version."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def cached(self, version_fn):
+        """Decorate a Flask view whose JSON output depends only on version_fn().
+
+        version_fn is called on every request and must be cheap; it should
+        advance whenever the data behind the view changes.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                version = version_fn()
+                key = (request.path, tuple(sorted(request.args.items(multi=True))), version)
+
+                with self._lock:
+                    entry = self._entries.get(key)
+                    if entry is not None:
+                        self._entries.move_to_end(key)
+
+                result = "hit"
+                if entry is None:
+                    response = view(*args, **kwargs)
+                    if not isinstance(response, Response) or response.status_code != 200:
+                        RESPONSE_CACHE_REQUESTS.inc(result="bypass")
+                        return response
+                    entry = _Entry(response.get_data(), response.mimetype)
+                    with self._lock:
+                        self._entries[key] = entry
+                        while len(self._entries) > self.max_entries:
+                            self._entries.popitem(last=False)
+                    result = "miss"
+
+                use_gzip = entry.gzipped is not None and _accepts_gzip(request.headers.get("Accept-Encoding"))
+                etag = entry.gzip_etag if use_gzip else entry.etag
+                # A new data version with identical content still revalidates
+                if _etag_matches(request.headers.get("If-None-Match"), etag):
+                    RESPONSE_CACHE_REQUESTS.inc(result="not_modified")
+                    return self._not_modified(etag)
+                RESPONSE_CACHE_REQUESTS.inc(result=result)
+                return self._full_response(entry, use_gzip, etag)
+            return wrapper
+        return decorator
+
+    def _not_modified(self, etag):
+        response = Response(status=304)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+    def _full_response(self, entry, use_gzip, etag):
+        if use_gzip:
+            response = Response(entry.gzipped, mimetype=entry.mimetype)
+            response.headers["Content-Encoding"] = "gzip"
+        else:
+            response = Response(entry.body, mimetype=entry.mimetype)
+        response.headers["ETag"] = etag
+        # Let browsers keep the body but revalidate on every poll
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
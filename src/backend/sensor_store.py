@@ -0,0 +1,187 @@
+"""
+GreenBharat AI — Sensor Store
+Incrementally ingests the simulator's sensor CSV for the API server.
+Only bytes appended since the last refresh are parsed; subscribers are
+notified with each batch of new rows so indexes can be maintained at ingest.
+
+Rows are kept as compact tuples (SensorRow) with dict-style access by column
+name, and low-cardinality values are interned, to keep per-row memory down
+for long histories.
+"""
+
+import csv
+import os
+import sys
+import threading
+
+from src.metrics import REGISTRY
+
+INGEST_ROWS = REGISTRY.counter("api_ingest_rows_total", "Sensor rows ingested from the CSV.")
+FILE_READ_BYTES = REGISTRY.counter("api_file_read_bytes_total", "Bytes read from data files.", ["file"])
+
+READ_CHUNK_BYTES = 8 * 1024 * 1024  # bounds the transient memory of a large ingest
+HEAD_BYTES = 4096  # leading bytes compared on refresh to detect a rewritten file
+# Columns with few distinct values, shared between rows instead of stored per row
+INTERNED_COLUMNS = {"city", "station_id", "latitude", "longitude", "aqi", "aqi_category"}
+
+
+class SensorRow(tuple):
+    """A CSV row as a tuple of its values, read like a dict keyed by column name."""
+
+    __slots__ = ()
+    _index = {}
+    _fields = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self._index[key])
+        return tuple.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        i = self._index.get(key)
+        return default if i is None else tuple.__getitem__(self, i)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def keys(self):
+        return self._fields
+
+    def items(self):
+        return zip(self._fields, tuple.__iter__(self))
+
+    def to_dict(self):
+        return dict(self.items())
+
+
+def _row_type(fieldnames):
+    """SensorRow subclass for a file's header."""
+    fields = tuple(fieldnames)
+    return type("SensorRow", (SensorRow,), {
+        "__slots__": (),
+        "_index": {name: i for i, name in enumerate(fields)},
+        "_fields": fields,
+    })
+
+
+class SensorStore:
+    """In-memory, append-only view of a growing sensor CSV file."""
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.records = []
+        self.version = 0  # advances only when new rows are ingested
+        self._offset = 0
+        self._file_id = None  # (st_dev, st_ino) of the file being tailed
+        self._head = b""  # first ingested bytes, up to HEAD_BYTES
+        self._fieldnames = None
+        self._row_type = None
+        self._interned = ()  # column indices whose values are interned
+        self._listeners = []
+        self._resets = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, on_rows, on_reset=None):
+        """Register callbacks for new row batches and for file truncation."""
+        self._listeners.append(on_rows)
+        if on_reset is not None:
+            self._resets.append(on_reset)
+
+    def refresh(self):
+        """Ingest any rows appended since the last call and return all records."""
+        with self._lock:
+            try:
+                stat = os.stat(self.filepath)
+            except OSError:
+                return self.records
+
+            size = stat.st_size
+            file_id = (stat.st_dev, stat.st_ino)
+            if self._offset and (size < self._offset or file_id != self._file_id or self._head_changed()):
+                # File was truncated or replaced — start over
+                self._reset()
+            self._file_id = file_id
+            ingested = False
+            while self._offset < size:
+                chunk_rows = self._read_chunk(min(size - self._offset, READ_CHUNK_BYTES))
+                if chunk_rows is None:
+                    break
+                if chunk_rows:
+                    self.records.extend(chunk_rows)
+                    INGEST_ROWS.inc(len(chunk_rows))
+                    for listener in self._listeners:
+                        listener(chunk_rows)
+                    ingested = True
+            if ingested:
+                self.version += 1
+            return self.records
+
+    def _head_changed(self):
+        """Whether the file no longer starts with the bytes already ingested.
+
+        Catches a file rewritten in place that has already grown back past
+        the read offset, which neither the size nor the inode reveals.
+        """
+        try:
+            with open(self.filepath, "rb") as f:
+                head = f.read(len(self._head))
+        except OSError:
+            return False
+        FILE_READ_BYTES.inc(len(head), file=os.path.basename(self.filepath))
+        return head != self._head
+
+    def _read_chunk(self, length):
+        """Parse up to `length` bytes of complete lines; None if nothing was consumed."""
+        try:
+            with open(self.filepath, "rb") as f:
+                f.seek(self._offset)
+                chunk = f.read(length)
+        except OSError as e:
+            print(f"[API] Error reading CSV: {e}")
+            return None
+
+        FILE_READ_BYTES.inc(len(chunk), file=os.path.basename(self.filepath))
+
+        # Leave a partially written last line for the next refresh
+        end = chunk.rfind(b"\n") + 1
+        if end == 0:
+            return None
+        if len(self._head) < HEAD_BYTES:
+            self._head += chunk[:min(end, HEAD_BYTES - len(self._head))]
+        self._offset += end
+        lines = chunk[:end].decode("utf-8", errors="replace").splitlines()
+        del chunk
+
+        if self._fieldnames is None:
+            self._fieldnames = next(csv.reader(lines[:1]), None) or []
+            self._row_type = _row_type(self._fieldnames)
+            self._interned = [i for i, name in enumerate(self._fieldnames) if name in INTERNED_COLUMNS]
+            lines = lines[1:]
+
+        row_type = self._row_type
+        width = len(self._fieldnames)
+        interned = self._interned
+        city = row_type._index.get("city")
+        rows = []
+        for values in csv.reader(lines):
+            if len(values) != width:
+                if not values:
+                    continue
+                values = (values + [None] * width)[:width]
+            if city is None or not values[city]:
+                continue
+            for i in interned:
+                if values[i] is not None:
+                    values[i] = sys.intern(values[i])
+            rows.append(row_type(values))
+        return rows
+
+    def _reset(self):
+        self.records = []
+        self.version += 1
+        self._offset = 0
+        self._head = b""
+        self._fieldnames = None
+        self._row_type = None
+        for on_reset in self._resets:
+            on_reset()
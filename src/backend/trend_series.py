@@ -0,0 +1,151 @@
+"""
+GreenBharat AI — Trend Series
+Per-city columnar history of the charted readings, appended at ingest, and
+Largest-Triangle-Three-Buckets (LTTB) decimation over it. Long ranges are
+reduced to a fixed number of visually representative points per series
+before serialization.
+"""
+
+import threading
+from datetime import datetime
+
+import numpy as np
+
+TREND_FIELDS = ("aqi", "pm25", "pm10", "temperature", "humidity")
+_INITIAL_CAPACITY = 1024
+
+
+def lttb(x, y, n_out):
+    """Return indices of the points LTTB keeps when reducing (x, y) to n_out.
+
+    The first and last points are always kept. The interior is split into
+    n_out - 2 equal buckets; from each, the point forming the largest triangle
+    with the previously kept point and the next bucket's centroid is chosen.
+    Bucket centroids and triangle areas are computed with numpy; only the
+    walk over buckets, where each choice depends on the previous one, is a
+    Python loop.
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out <= 2:
+        return np.array([0, n - 1][:max(n_out, 0)], dtype=np.int64)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Epoch seconds are ~1.7e9; measure from the first point to keep precision in the areas
+    x = x - x[0]
+
+    # Bucket i covers [edges[i], edges[i + 1]) of the interior points 1 .. n-2
+    edges = (np.floor(np.arange(n_out - 1) * ((n - 2) / (n_out - 2))) + 1).astype(np.int64)
+    edges[-1] = n - 1
+    counts = np.diff(edges)
+    starts = edges[:-1]
+    centroid_x = np.add.reduceat(x, starts) / counts
+    centroid_y = np.add.reduceat(y, starts) / counts
+    # The last bucket looks ahead to the final point instead of a centroid
+    next_x = np.append(centroid_x[1:], x[-1])
+    next_y = np.append(centroid_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        # Twice the triangle area; the constant factor does not change argmax
+        areas = np.abs((ax - next_x[i]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y[i] - ay))
+        a = lo + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+class _Column:
+    """Growable float64 array with amortized O(1) appends."""
+
+    def __init__(self):
+        self.data = np.empty(_INITIAL_CAPACITY, dtype=np.float64)
+        self.size = 0
+
+    def extend(self, values):
+        needed = self.size + len(values)
+        if needed > len(self.data):
+            grown = np.empty(max(needed, 2 * len(self.data)), dtype=np.float64)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:needed] = values
+        self.size = needed
+
+    def view(self):
+        return self.data[:self.size]
+
+
+class TrendSeries:
+    """Per-city time, timestamp-string and value columns for trend charts."""
+
+    def __init__(self, fields=TREND_FIELDS):
+        self.fields = tuple(fields)
+        self._cities = {}  # city -> {"t": _Column, "timestamps": [str], field: _Column}
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._cities.clear()
+
+    def cities(self):
+        with self._lock:
+            return list(self._cities)
+
+    def append(self, rows):
+        """Append sensor rows (as read from the CSV) to their cities' columns."""
+        by_city = {}
+        for row in rows:
+            try:
+                t = datetime.fromisoformat(row["timestamp"]).timestamp()
+                values = [float(row.get(field, 0) or 0) for field in self.fields]
+            except (KeyError, TypeError, ValueError):
+                continue
+            batch = by_city.setdefault(row.get("city", ""), ([], [], []))
+            batch[0].append(t)
+            batch[1].append(row["timestamp"])
+            batch[2].append(values)
+
+        with self._lock:
+            for city, (times, timestamps, values) in by_city.items():
+                columns = self._cities.get(city)
+                if columns is None:
+                    columns = self._cities[city] = {"t": _Column(), "timestamps": []}
+                    for field in self.fields:
+                        columns[field] = _Column()
+                columns["t"].extend(times)
+                columns["timestamps"].extend(timestamps)
+                matrix = np.asarray(values, dtype=np.float64)
+                for j, field in enumerate(self.fields):
+                    columns[field].extend(matrix[:, j])
+
+    def decimate(self, city, points, fields=None, limit=None):
+        """Return {field: {"timestamps": [...], "values": [...]}} with at most
+        `points` LTTB-selected points per field, over the last `limit`
+        readings of the city (all of them if limit is None).
+        """
+        fields = fields or self.fields
+        with self._lock:
+            columns = self._cities.get(city)
+            if columns is None:
+                return {}
+            size = columns["t"].size
+            start = max(0, size - limit) if limit else 0
+            t = columns["t"].view()[start:size]
+            timestamps = columns["timestamps"]
+            series = {field: columns[field].view()[start:size] for field in fields}
+
+        result = {}
+        for field, values in series.items():
+            indices = lttb(t, values, points)
+            selected = values[indices]
+            result[field] = {
+                "timestamps": [timestamps[start + i] for i in indices.tolist()],
+                "values": [int(v) for v in selected] if field == "aqi" else selected.tolist(),
+            }
+        return result
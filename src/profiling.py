@@ -0,0 +1,286 @@
+"""
+GreenBharat AI — Profiling
+Opt-in profiling shared by all services. Enable it with the GREENBHARAT_PROFILE=1
+environment variable or the --profile flag on any service.
+
+When enabled, a background thread samples the Python stacks of every thread
+and per-stage timings are recorded via `stage()`. On exit both are written to
+GREENBHARAT_PROFILE_DIR (default ./profiles):
+    <service>-<pid>.speedscope.json   open at https://www.speedscope.app
+    <service>-<pid>.stages.json       per-stage count / total / max seconds
+
+When disabled, `stage()` returns a shared no-op context manager and nothing
+else runs.
+
+Rank the hottest functions in recorded profiles with:
+    python -m src.profiling report [profiles/]
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+PROFILE_DIR = os.environ.get("GREENBHARAT_PROFILE_DIR", "profiles")
+SAMPLE_INTERVAL_MS = float(os.environ.get("GREENBHARAT_PROFILE_INTERVAL_MS", 5))
+
+# Leaf frames of threads that are blocked waiting, not doing work
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("socket.py", "accept"),
+    ("socketserver.py", "serve_forever"),
+    ("queue.py", "get"),
+}
+
+_enabled = False
+_service = None
+_sampler = None
+_stages = defaultdict(lambda: [0, 0.0, 0.0])  # name -> [count, total_s, max_s]
+_stages_lock = threading.Lock()
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record_stage(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def is_enabled():
+    return _enabled
+
+
+def stage(name):
+    """Context manager timing a named stage; a no-op when profiling is off."""
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name)
+
+
+def record_stage(name, seconds):
+    """Add one timed occurrence of a stage."""
+    if not _enabled:
+        return
+    with _stages_lock:
+        entry = _stages[name]
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds)
+
+
+class StackSampler(threading.Thread):
+    """Periodically snapshot the Python stacks of all other threads."""
+
+    def __init__(self, interval_s):
+        super().__init__(name="profiling-sampler", daemon=True)
+        self.interval_s = interval_s
+        self.samples = Counter()  # tuple of frame keys, root first -> count
+        self.frames = {}  # frame key -> {"name", "file", "line"}
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval_s):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    key = (code.co_filename, code.co_firstlineno, code.co_name)
+                    if key not in self.frames:
+                        self.frames[key] = {
+                            "name": code.co_name,
+                            "file": code.co_filename,
+                            "line": code.co_firstlineno,
+                        }
+                    stack.append(key)
+                    frame = frame.f_back
+                if not stack:
+                    continue
+                leaf = stack[0]
+                if (os.path.basename(leaf[0]), leaf[2]) in IDLE_LEAVES:
+                    continue
+                stack.reverse()
+                with self._lock:
+                    self.samples[tuple(stack)] += 1
+
+    def stop(self):
+        self._stop_event.set()
+
+    def to_speedscope(self, name):
+        """Return the samples as a speedscope 'sampled' profile document."""
+        with self._lock:
+            samples = list(self.samples.items())
+        index = {}
+        frames = []
+        sampled_stacks = []
+        weights = []
+        for stack, count in samples:
+            ids = []
+            for key in stack:
+                if key not in index:
+                    index[key] = len(frames)
+                    frames.append(self.frames[key])
+                ids.append(index[key])
+            sampled_stacks.append(ids)
+            weights.append(count * self.interval_s)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": sampled_stacks,
+                "weights": weights,
+            }],
+            "name": name,
+            "exporter": "greenbharat-profiling",
+        }
+
+
+def enable(service):
+    """Turn profiling on for this process and write results at exit."""
+    global _enabled, _service, _sampler
+    if _enabled:
+        return
+    _enabled = True
+    _service = service
+    _sampler = StackSampler(SAMPLE_INTERVAL_MS / 1000.0)
+    _sampler.start()
+    atexit.register(write_profiles)
+    print(f"[PROFILE] Profiling {service}: sampling every {SAMPLE_INTERVAL_MS:g} ms into {PROFILE_DIR}/")
+
+
+def enable_from_env(service, argv=None):
+    """Enable profiling if GREENBHARAT_PROFILE is set or --profile was passed."""
+    argv = sys.argv if argv is None else argv
+    if "--profile" in argv or os.environ.get("GREENBHARAT_PROFILE", "") not in ("", "0"):
+        enable(service)
+
+
+def write_profiles():
+    """Write the speedscope profile and stage timings collected so far."""
+    if not _enabled:
+        return None
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    prefix = os.path.join(PROFILE_DIR, f"{_service}-{os.getpid()}")
+    with open(prefix + ".speedscope.json", "w", encoding="utf-8") as f:
+        json.dump(_sampler.to_speedscope(_service), f)
+    with _stages_lock:
+        stages = {
+            name: {"count": count, "total_s": round(total, 6), "max_s": round(worst, 6),
+                   "mean_s": round(total / count, 6) if count else 0.0}
+            for name, (count, total, worst) in _stages.items()
+        }
+    with open(prefix + ".stages.json", "w", encoding="utf-8") as f:
+        json.dump({"service": _service, "stages": stages}, f, indent=2)
+    print(f"[PROFILE] Wrote {prefix}.speedscope.json and {prefix}.stages.json")
+    return prefix
+
+
+def install_flask_profiling(app):
+    """Time JSON encoding of responses for a Flask app (only when enabled)."""
+    if not _enabled:
+        return
+    from flask.json.provider import DefaultJSONProvider
+
+    class TimedJSONProvider(DefaultJSONProvider):
+        def dumps(self, obj, **kwargs):
+            with stage("json_encode"):
+                return super().dumps(obj, **kwargs)
+
+    app.json = TimedJSONProvider(app)
+
+
+# --- Report ---
+
+def _load_speedscope(path):
+    with open(path, "r", encoding="utf-8") as f:
+        doc = json.load(f)
+    frames = doc["shared"]["frames"]
+    for profile in doc["profiles"]:
+        for stack, weight in zip(profile["samples"], profile["weights"]):
+            yield [frames[i] for i in stack], weight
+
+
+def report(paths, top=25):
+    """Print functions ranked by self and total sampled time, then stage timings."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path)))
+        else:
+            files.append(path)
+
+    self_time = Counter()
+    total_time = Counter()
+    overall = 0.0
+    for path in files:
+        if not path.endswith(".speedscope.json"):
+            continue
+        for stack, weight in _load_speedscope(path):
+            overall += weight
+            labels = [f"{fr['name']} ({os.path.basename(fr['file'])}:{fr['line']})" for fr in stack]
+            self_time[labels[-1]] += weight
+            for label in set(labels):
+                total_time[label] += weight
+
+    if overall:
+        print(f"Sampled time: {overall:.2f}s\n")
+        print(f"{'self %':>7} {'total %':>8}  function")
+        for label, seconds in self_time.most_common(top):
+            print(f"{100 * seconds / overall:7.1f} {100 * total_time[label] / overall:8.1f}  {label}")
+    else:
+        print("No samples found.")
+
+    for path in files:
+        if not path.endswith(".stages.json"):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            doc = json.load(f)
+        stages = sorted(doc["stages"].items(), key=lambda kv: -kv[1]["total_s"])
+        if not stages:
+            continue
+        print(f"\nStages — {os.path.basename(path)}")
+        print(f"{'total s':>10} {'count':>8} {'mean ms':>9} {'max ms':>9}  stage")
+        for name, s in stages:
+            print(f"{s['total_s']:10.3f} {s['count']:8d} {s['mean_s'] * 1000:9.2f} {s['max_s'] * 1000:9.2f}  {name}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="GreenBharat profiling tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report_parser = sub.add_parser("report", help="rank hot functions in recorded profiles")
+    report_parser.add_argument("paths", nargs="*", default=[PROFILE_DIR])
+    report_parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+    report(args.paths, args.top)
@@ -10,12 +10,19 @@ import os
 import time
 import random
 import math
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from src.metrics import REGISTRY, start_metrics_server
 
 # --- Configuration ---
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 OUTPUT_FILE = os.path.join(DATA_DIR, "sensor_data.csv")
 INTERVAL_SECONDS = 4  # Time between data points
+METRICS_PORT = 9102
+
+READINGS_EMITTED = REGISTRY.counter("simulator_readings_total", "Readings appended to the CSV.", ["city"])
+BYTES_WRITTEN = REGISTRY.counter("simulator_written_bytes_total", "Bytes appended to the CSV.")
+LAST_EMIT = REGISTRY.gauge("simulator_last_emit_timestamp_seconds", "Unix time of the last batch written.")
 
 # Indian cities with baseline pollution profiles
 CITIES = {
@@ -122,10 +129,15 @@ def get_aqi_category(aqi):
         return "Severe"
 
 
-def generate_reading(city_name, city_config, tick):
-    """Generate a single simulated sensor reading with realistic variation."""
+def generate_reading(city_name, city_config, tick, now=None):
+    """Generate a single simulated sensor reading with realistic variation.
+
+    `now` fixes the reading's clock (for reproducible datasets); it defaults
+    to the current time.
+    """
+    now = now or datetime.now()
     # Time-of-day effect (rush hours = more pollution)
-    hour = datetime.now().hour
+    hour = now.hour
     time_factor = 1.0
     if 7 <= hour <= 10 or 17 <= hour <= 20:  # Rush hours
         time_factor = 1.3
@@ -154,7 +166,7 @@ def generate_reading(city_name, city_config, tick):
     category = get_aqi_category(aqi)
 
     return {
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now.isoformat(),
         "city": city_name,
         "latitude": city_config["lat"],
         "longitude": city_config["lon"],
@@ -172,6 +184,37 @@ def generate_reading(city_name, city_config, tick):
     }
 
 
+def simulate_tick(tick, now=None):
+    """Generate readings for 2-4 random cities, as one simulator tick would."""
+    cities_list = list(CITIES.keys())
+    # Pick 2-4 random cities per tick for realistic staggered updates
+    num_cities = random.randint(2, min(4, len(cities_list)))
+    selected = random.sample(cities_list, num_cities)
+    return [generate_reading(city_name, CITIES[city_name], tick, now) for city_name in selected]
+
+
+def write_dataset(filepath, num_readings, seed=0, start=None, interval_seconds=INTERVAL_SECONDS):
+    """Write a reproducible CSV of simulated readings without sleeping.
+
+    The same seed, start time and size always produce the same file.
+    """
+    random.seed(seed)
+    start = start or datetime(2026, 1, 1)
+    os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+    written = 0
+    tick = 0
+    with open(filepath, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_HEADERS)
+        writer.writeheader()
+        while written < num_readings:
+            now = start + timedelta(seconds=tick * interval_seconds)
+            rows = simulate_tick(tick, now)[:num_readings - written]
+            writer.writerows(rows)
+            written += len(rows)
+            tick += 1
+    return written
+
+
 def init_csv():
     """Initialize CSV file with headers if it doesn't exist."""
     os.makedirs(DATA_DIR, exist_ok=True)
@@ -191,26 +234,25 @@ def run_simulator():
     print(f"  Generating data for {len(CITIES)} cities")
     print(f"  Output: {OUTPUT_FILE}")
     print(f"  Interval: {INTERVAL_SECONDS}s")
+    print(f"  Metrics:  http://0.0.0.0:{METRICS_PORT}/metrics")
     print("=" * 60)
+    start_metrics_server(METRICS_PORT)
 
     tick = 0
-    cities_list = list(CITIES.keys())
 
     try:
         while True:
-            # Pick 2-4 random cities per tick for realistic staggered updates
-            num_cities = random.randint(2, min(4, len(cities_list)))
-            selected = random.sample(cities_list, num_cities)
-
-            rows = []
-            for city_name in selected:
-                reading = generate_reading(city_name, CITIES[city_name], tick)
-                rows.append(reading)
+            rows = simulate_tick(tick)
 
             # Append to CSV
             with open(OUTPUT_FILE, "a", newline="") as f:
+                start = f.tell()
                 writer = csv.DictWriter(f, fieldnames=CSV_HEADERS)
                 writer.writerows(rows)
+                BYTES_WRITTEN.inc(f.tell() - start)
+            for row in rows:
+                READINGS_EMITTED.inc(city=row["city"])
+            LAST_EMIT.set(time.time())
 
             for row in rows:
                 emoji = "🟢" if row["aqi"] <= 50 else "🟡" if row["aqi"] <= 100 else "🟠" if row["aqi"] <= 200 else "🔴" if row["aqi"] <= 300 else "🟣" if row["aqi"] <= 400 else "⚫"